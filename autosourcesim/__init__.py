@@ -1,6 +1,31 @@
-from autosourcesim.stream import EventStream
-from autosourcesim.sources import EventSource, PostHogSource, GitHubSource
-from autosourcesim.events import BaseEvent
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from autosourcesim.profiling import Profiler, StageStats
+
+if TYPE_CHECKING:
+    from autosourcesim.stream import EventStream
+    from autosourcesim.sources import EventSource, PostHogSource, GitHubSource
+    from autosourcesim.events import BaseEvent, CompactEvent
 
 __version__ = "0.1.0"
-__all__ = ["EventStream", "EventSource", "PostHogSource", "GitHubSource", "BaseEvent"] 
\ No newline at end of file
+__all__ = ["EventStream", "EventSource", "PostHogSource", "GitHubSource", "BaseEvent", "CompactEvent", "Profiler", "StageStats"]
+
+# Exports imported on first access, so importing the package (or its
+# dependency-free profiling module) does not load the sources and models
+_LAZY_EXPORTS = {
+    "EventStream": "autosourcesim.stream",
+    "EventSource": "autosourcesim.sources",
+    "PostHogSource": "autosourcesim.sources",
+    "GitHubSource": "autosourcesim.sources",
+    "BaseEvent": "autosourcesim.events",
+    "CompactEvent": "autosourcesim.events",
+}
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, List, Optional
+
+STREAM_PACING = ("flood", "replay")
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_CHUNK_SIZE = 256
+
+class _Done:
+    """Marks the end of the producer's stream, carrying its exception if it failed."""
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+def _event_time(event: Any) -> datetime:
+    """Simulated time of a story Event (ISO string) or an autosourcesim event."""
+    timestamp = event.timestamp
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp)
+    return timestamp
+
+async def astream(
+    events: Iterable[Any],
+    mode: str = "flood",
+    speed: float = 1.0,
+    maxsize: int = DEFAULT_QUEUE_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[Any]:
+    """
+    Iterate a synchronous event stream asynchronously.
+    
+    The events are generated in a background thread and handed over in
+    chunks through a bounded queue. Once `maxsize` chunks are waiting, the
+    generator blocks until the consumer catches up, so a slow consumer
+    provides backpressure without ever blocking the event loop.
+    
+    In "flood" mode events are yielded as fast as the consumer awaits them.
+    In "replay" mode each event is held back until its simulated timestamp,
+    measured from the first event and divided by `speed`, has elapsed in
+    real time; speed=60 replays an hour of traffic per minute.
+    
+    Example:
+        async for event in astream(stream.run(), mode="replay", speed=60):
+            await client.send(event)
+    
+    `EventStream.arun` and `sim`'s `SimulationEngine.astream_story` are
+    shortcuts for their own streams.
+    
+    Args:
+        events: Any event iterable, e.g. `EventStream.run()` or `stream_story()`
+        mode: "flood" or "replay"
+        speed: Replay speed factor relative to real time
+        maxsize: Maximum number of chunks waiting in the queue
+        chunk_size: Maximum number of events handed over at once
+    """
+    if mode not in STREAM_PACING:
+        raise ValueError(f"Unknown stream pacing mode: {mode}")
+    if speed <= 0:
+        raise ValueError("Replay speed must be positive")
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+    
+    def put(item: Any) -> None:
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+    
+    def produce() -> None:
+        try:
+            chunk: List[Any] = []
+            for event in events:
+                if stopped.is_set():
+                    return
+                chunk.append(event)
+                if len(chunk) >= chunk_size:
+                    put(chunk)
+                    chunk = []
+            if chunk:
+                put(chunk)
+            put(_Done())
+        except BaseException as e:
+            if not stopped.is_set():
+                put(_Done(e))
+    
+    producer = loop.run_in_executor(None, produce)
+    start_time: Optional[datetime] = None
+    start_clock = 0.0
+    try:
+        while True:
+            chunk = await queue.get()
+            if isinstance(chunk, _Done):
+                if chunk.error is not None:
+                    raise chunk.error
+                break
+            for event in chunk:
+                if mode == "replay":
+                    event_time = _event_time(event)
+                    if start_time is None:
+                        start_time, start_clock = event_time, loop.time()
+                    due = start_clock + (event_time - start_time).total_seconds() / speed
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                yield event
+    finally:
+        # Unblock a producer waiting on a full queue and let it exit
+        stopped.set()
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.001)
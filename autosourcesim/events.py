@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple, Type
 
 class BaseEvent(BaseModel):
     """Base class for all events in the system."""
@@ -16,4 +16,40 @@ class BaseEvent(BaseModel):
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
-        } 
\ No newline at end of file
+        } 
+
+class CompactEvent(NamedTuple):
+    """
+    Lightweight, tuple-backed event emitted by `EventStream(compact=True)`.
+
+    Nothing is validated when it is created and the source and event type
+    strings are interned. Source-specific fields such as `org_id` or `repo`
+    live in `fields` and are also readable as attributes. Call `to_model()`
+    to get the full pydantic event at the edge.
+    """
+    source: str
+    event_type: str
+    timestamp: datetime
+    data: Dict[str, Any]
+    fields: Dict[str, Any]
+    model: Type[BaseEvent]
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def get_source_name(self) -> str:
+        """Get the canonical name of the event source."""
+        return self.source.lower()
+
+    def to_model(self) -> BaseEvent:
+        """Convert to the validated pydantic event of the emitting source."""
+        return self.model(
+            source=self.source,
+            event_type=self.event_type,
+            timestamp=self.timestamp,
+            data=self.data,
+            **self.fields
+        )
@@ -0,0 +1,194 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional
+
+# Called as callback(stage, key, seconds) for every recorded call
+ProfileCallback = Callable[[str, Optional[Hashable], float], None]
+
+class StageStats:
+    """Cumulative call count and time of one stage."""
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self, calls: int = 0, seconds: float = 0.0):
+        self.calls = calls
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return f"StageStats(calls={self.calls}, seconds={self.seconds:.6f})"
+
+class Profiler:
+    """
+    Opt-in stage timing for the generation engines.
+
+    Records cumulative time and call counts per stage, both overall and per
+    key (a source name or a (source, event) pair). Engines only instrument
+    their hot paths when given a profiler, by wrapping the callables they
+    use once up front, so running without one costs nothing.
+
+    Args:
+        callback: Optional function called as `callback(stage, key, seconds)`
+            for every recorded call, e.g. to feed a metrics system
+    """
+
+    def __init__(self, callback: Optional[ProfileCallback] = None):
+        self.callback = callback
+        self.stages: Dict[str, StageStats] = {}
+        self.keys: Dict[Hashable, Dict[str, StageStats]] = {}
+
+    def stage(self, stage: str, key: Optional[Hashable] = None) -> StageStats:
+        """Get the stats of a stage, overall or for one key."""
+        stages = self.stages if key is None else self.keys.setdefault(key, {})
+        stats = stages.get(stage)
+        if stats is None:
+            stats = stages[stage] = StageStats()
+        return stats
+
+    def record(self, stage: str, seconds: float, key: Optional[Hashable] = None, calls: int = 1) -> None:
+        """Add calls and time to a stage, and to the key's stage when given."""
+        stats = self.stage(stage)
+        stats.calls += calls
+        stats.seconds += seconds
+        if key is not None:
+            stats = self.stage(stage, key)
+            stats.calls += calls
+            stats.seconds += seconds
+        if self.callback is not None:
+            self.callback(stage, key, seconds)
+
+    @contextmanager
+    def timed(self, stage: str, key: Optional[Hashable] = None) -> Iterator[None]:
+        """Time a block as one call of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, key)
+
+    def wrap(self, stage: str, func: Callable[..., Any], key: Optional[Hashable] = None) -> Callable[..., Any]:
+        """
+        Wrap a callable so every call is recorded under a stage.
+
+        Functions returning lazy iterators are only timed up to creating them.
+        """
+        add = self._recorder(stage, key)
+        perf_counter = time.perf_counter
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(perf_counter() - start)
+
+        return timed
+
+    def iterate(self, stage: str, items: Iterable[Any], key: Optional[Hashable] = None) -> Iterator[Any]:
+        """Iterate lazily, recording each item's production as one call of a stage."""
+        add = self._recorder(stage, key)
+        perf_counter = time.perf_counter
+        iterator = iter(items)
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            add(perf_counter() - start)
+            yield item
+
+    def _recorder(self, stage: str, key: Optional[Hashable]) -> Callable[[float], None]:
+        """Build a fast function adding one call of the given duration to a stage."""
+        stats = self.stage(stage)
+        key_stats = self.stage(stage, key) if key is not None else None
+        callback = self.callback
+
+        def add(elapsed: float) -> None:
+            stats.calls += 1
+            stats.seconds += elapsed
+            if key_stats is not None:
+                key_stats.calls += 1
+                key_stats.seconds += elapsed
+            if callback is not None:
+                callback(stage, key, elapsed)
+
+        return add
+
+    def bind(self, key: Hashable) -> "BoundProfiler":
+        """Get a view of this profiler that records everything under `key`."""
+        return BoundProfiler(self, key)
+
+    def merge(self, other: "Profiler") -> None:
+        """Add the stats of another profiler, e.g. one from a worker process."""
+        for stage, stats in other.stages.items():
+            target = self.stage(stage)
+            target.calls += stats.calls
+            target.seconds += stats.seconds
+        for key, stages in other.keys.items():
+            for stage, stats in stages.items():
+                target = self.stage(stage, key)
+                target.calls += stats.calls
+                target.seconds += stats.seconds
+
+    def reset(self) -> None:
+        """Forget all recorded stats."""
+        self.stages.clear()
+        self.keys.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Stats as plain data: {"stages": {...}, "keys": [{"key": ..., "stages": {...}}]}."""
+        def stages_dict(stages: Dict[str, StageStats]) -> Dict[str, Dict[str, float]]:
+            return {
+                stage: {"calls": stats.calls, "seconds": stats.seconds}
+                for stage, stats in stages.items()
+            }
+        return {
+            "stages": stages_dict(self.stages),
+            "keys": [
+                {"key": list(key) if isinstance(key, tuple) else key, "stages": stages_dict(stages)}
+                for key, stages in self.keys.items()
+            ],
+        }
+
+    def summary(self) -> str:
+        """Human-readable table of stages, slowest first, then per key."""
+        lines = [f"{'stage':<40} {'calls':>12} {'seconds':>12} {'us/call':>10}"]
+
+        def add(stages: Dict[str, StageStats], indent: str = "") -> None:
+            for stage, stats in sorted(stages.items(), key=lambda item: -item[1].seconds):
+                per_call = stats.seconds / stats.calls * 1e6 if stats.calls else 0.0
+                lines.append(
+                    f"{indent + stage:<40} {stats.calls:>12} {stats.seconds:>12.4f} {per_call:>10.2f}"
+                )
+
+        add(self.stages)
+        for key, stages in sorted(self.keys.items(), key=lambda item: str(item[0])):
+            lines.append("")
+            lines.append(str(key))
+            add(stages, "  ")
+        return "\n".join(lines)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Callbacks are often closures or bound methods; ship only the stats
+        return {"callback": None, "stages": self.stages, "keys": self.keys}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+class BoundProfiler:
+    """A profiler view recording every stage under a fixed key as well."""
+
+    def __init__(self, profiler: Profiler, key: Hashable):
+        self.profiler = profiler
+        self.key = key
+
+    def record(self, stage: str, seconds: float, calls: int = 1) -> None:
+        self.profiler.record(stage, seconds, self.key, calls)
+
+    def timed(self, stage: str):
+        return self.profiler.timed(stage, self.key)
+
+    def wrap(self, stage: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        return self.profiler.wrap(stage, func, self.key)
+
+    def iterate(self, stage: str, items: Iterable[Any]) -> Iterator[Any]:
+        return self.profiler.iterate(stage, items, self.key)
@@ -0,0 +1,13 @@
+import hashlib
+from typing import Union
+
+def derive_seed(master: int, *keys: Union[int, str]) -> int:
+    """
+    Derive a child seed from a master seed and a path of keys.
+
+    Uses a cryptographic hash rather than `hash()`, so the same master seed
+    and keys give the same child seed in every process and on every run.
+    This is the one substream scheme shared by `EventStream` and `sim`.
+    """
+    material = ":".join(str(part) for part in (master, *keys)).encode()
+    return int.from_bytes(hashlib.sha256(material).digest()[:8], "big")
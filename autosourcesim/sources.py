@@ -1,8 +1,36 @@
+import inspect
+import math
+import random
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Callable, Dict, Any, Optional, List, Iterable, Iterator, Type, Union
+from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
-from .events import BaseEvent
+from .events import BaseEvent, CompactEvent
+
+# What a source may return for a single tick: nothing, one event or a batch
+EventBatch = Union[BaseEvent, CompactEvent, Iterable[Union[BaseEvent, CompactEvent]], None]
+
+MINUTE = timedelta(minutes=1)
+
+def _geometric(rng: random.Random, p: float) -> Optional[int]:
+    """Draw the number of per-minute trials up to and including the first success."""
+    if p <= 0:
+        return None
+    if p >= 1:
+        return 1
+    return int(math.log(1.0 - rng.random()) / math.log(1.0 - p)) + 1
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    """Draw a Poisson count by summing exponential inter-arrival times."""
+    if mean <= 0:
+        return 0
+    count = 0
+    elapsed = rng.expovariate(mean)
+    while elapsed <= 1.0:
+        count += 1
+        elapsed += rng.expovariate(mean)
+    return count
 
 class EventSource(ABC):
     """
@@ -11,61 +39,164 @@ class EventSource(ABC):
     Args:
         name: Name of the source
         rules: Dictionary of rules for event generation
+        resolution: Optional tick length for this source, overriding the
+            stream's resolution
+        seed: Optional seed for this source's own RNG; unseeded sources added
+            to a seeded stream get a substream of the stream's seed
     """
-    def __init__(self, name: str, rules: Dict[str, Any]):
-        self.name = name
+    def __init__(
+        self,
+        name: str,
+        rules: Dict[str, Any],
+        resolution: Optional[timedelta] = None,
+        seed: Optional[int] = None
+    ):
+        self.name = sys.intern(name)
         self.rules = rules
+        self.resolution = resolution
+        self.seed = seed
+        self.rng = random.Random(seed)
     
     @abstractmethod
-    def generate_event(self, time: datetime, context: Dict) -> Optional[BaseEvent]:
-        """Generate the next event at the given time."""
+    def generate_event(self, time: datetime, context: Dict) -> EventBatch:
+        """
+        Generate the events for the tick starting at the given time.
+
+        May return a single event, None, or a list/iterator of events. The
+        tick length is available as `context["resolution"]`, and
+        `context["compact"]` asks for `CompactEvent`s (see `_build_event`).
+        """
         pass
     
+    def _build_event(
+        self,
+        model: Type[BaseEvent],
+        context: Dict,
+        event_type: str,
+        time: datetime,
+        data: Dict[str, Any],
+        **fields: Any
+    ) -> Union[BaseEvent, CompactEvent]:
+        """Build a pydantic event, or a CompactEvent when the stream asks for one."""
+        if context.get("compact"):
+            return CompactEvent(self.name, sys.intern(event_type), time, data, fields, model)
+        return model(source=self.name, event_type=event_type, timestamp=time, data=data, **fields)
+    
     def update_context(self, event: BaseEvent, context: Dict) -> Dict:
         """Update source context after generating an event."""
         return context
 
+    def next_event_time(self, after: datetime, context: Dict) -> Optional[datetime]:
+        """
+        Return the next time after `after` at which this source may fire.
+
+        Used by the scheduled mode of `EventStream`. The default steps one
+        tick ahead, which matches tick-based behaviour; sources that know
+        their own timing override this to skip idle periods. Returning None
+        means the source will not fire again.
+        """
+        return after + context.get("resolution", MINUTE)
+
 class PostHogEvent(BaseEvent):
     """PostHog specific event."""
     org_id: str = Field(..., description="Organization ID")
     data: Dict[str, Any] = Field(..., description="Event data")
 
+def _takes_current(func: Callable) -> bool:
+    """Check whether a rule function takes (current data, previous data) rather than just the previous."""
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = [
+        parameter for parameter in parameters
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+    ]
+    return len(positional) >= 2 or any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters)
+
 class PostHogSource(EventSource):
-    """PostHog event source."""
-    def __init__(self, org_id: str, rules: Dict[str, Any]):
-        super().__init__("posthog", rules)
+    """
+    PostHog event source.
+    
+    Each rule's `data` maps fields to functions. A function taking one
+    argument gets the previous event's data; one taking two gets the data
+    resolved so far for the current event and the previous event's data,
+    so fields can build on each other.
+    """
+    def __init__(
+        self,
+        org_id: str,
+        rules: Dict[str, Any],
+        resolution: Optional[timedelta] = None,
+        seed: Optional[int] = None
+    ):
+        super().__init__("posthog", rules, resolution, seed)
         self.org_id = org_id
+        self._takes_current: Dict[Callable, bool] = {}
     
-    def generate_event(self, time: datetime, context: Dict) -> Optional[BaseEvent]:
+    def generate_event(self, time: datetime, context: Dict) -> List[BaseEvent]:
+        events = []
         for event_type, rule in self.rules.items():
-            # Check if we should generate an event based on frequency
-            if self._should_generate(time, rule.get("frequency", "1h"), context):
+            # One event per frequency period covered by this tick
+            for _ in range(self._fire_count(time, rule.get("frequency", "1h"), context)):
                 # Generate event data using rule functions
                 data = {}
+                prev_data = context.get("prev_data", {})
                 for field, func in rule["data"].items():
-                    if callable(func):
-                        data[field] = func(context.get("prev_data", {}))
+                    if not callable(func):
+                        continue
+                    takes_current = self._takes_current.get(func)
+                    if takes_current is None:
+                        takes_current = self._takes_current[func] = _takes_current(func)
+                    data[field] = func(data, prev_data) if takes_current else func(prev_data)
                 
-                return PostHogEvent(
-                    source=self.name,
-                    event_type=event_type,
-                    timestamp=time,
-                    org_id=self.org_id,
-                    data=data
+                event = self._build_event(
+                    PostHogEvent, context, event_type, time, data, org_id=self.org_id
                 )
-        return None
+                context = self.update_context(event, context)
+                events.append(event)
+        return events
     
     def update_context(self, event: BaseEvent, context: Dict) -> Dict:
         context["prev_data"] = event.data
         return context
     
-    def _should_generate(self, time: datetime, frequency: str, context: Dict) -> bool:
-        """Determine if we should generate an event based on frequency."""
+    def _period(self, frequency: str) -> Optional[timedelta]:
+        """Map a rule frequency to its period."""
         if frequency.endswith('h'):
-            return time.minute == 0
+            return timedelta(hours=1)
         elif frequency.endswith('m'):
-            return True
-        return False
+            return MINUTE
+        return None
+    
+    def _fire_count(self, time: datetime, frequency: str, context: Dict) -> int:
+        """Count how many events a rule produces in the tick starting at `time`."""
+        period = self._period(frequency)
+        if period is None:
+            return 0
+        resolution = context.get("resolution", MINUTE)
+        if resolution >= period:
+            return resolution // period
+        # Sub-period ticks fire on the first tick of each period
+        if period == MINUTE:
+            period_start = time.replace(second=0, microsecond=0)
+        else:
+            period_start = time.replace(minute=0, second=0, microsecond=0)
+        return int(time - period_start < resolution)
+
+    def next_event_time(self, after: datetime, context: Dict) -> Optional[datetime]:
+        """Jump to the next minute or top of the hour, depending on rule frequencies."""
+        periods = [self._period(rule.get("frequency", "1h")) for rule in self.rules.values()]
+        periods = [period for period in periods if period is not None]
+        if not periods:
+            return None
+        period = min(periods)
+        resolution = context.get("resolution", MINUTE)
+        if resolution >= period:
+            return after + resolution
+        if period == MINUTE:
+            return after.replace(second=0, microsecond=0) + period
+        return after.replace(minute=0, second=0, microsecond=0) + period
 
 class GitHubEvent(BaseEvent):
     """GitHub specific event."""
@@ -74,27 +205,162 @@ class GitHubEvent(BaseEvent):
     data: Dict[str, Any] = Field(..., description="Event data")
 
 class GitHubSource(EventSource):
-    """GitHub event source."""
-    def __init__(self, repos: List[str], actors: List[str], rules: Dict[str, Any]):
-        super().__init__("github", rules)
+    """
+    GitHub event source.
+
+    Each rule fires with its per-minute `probability`, or, for high-rate
+    rules, with an expected `rate` of events per minute.
+    """
+    def __init__(
+        self,
+        repos: List[str],
+        actors: List[str],
+        rules: Dict[str, Any],
+        resolution: Optional[timedelta] = None,
+        seed: Optional[int] = None
+    ):
+        super().__init__("github", rules, resolution, seed)
         self.repos = repos
         self.actors = actors
     
-    def generate_event(self, time: datetime, context: Dict) -> Optional[BaseEvent]:
-        import random
-        
+    def generate_event(self, time: datetime, context: Dict) -> List[BaseEvent]:
+        schedule = context.get("schedule")
+        resolution = context.get("resolution", MINUTE)
+        events = []
         for event_type, rule in self.rules.items():
-            if self._should_generate(time, rule.get("probability", 0.1)):
-                return GitHubEvent(
+            if schedule is not None:
+                count = int(schedule.get(event_type) == time)
+            else:
+                count = self._fire_count(time, rule, resolution)
+            for _ in range(count):
+                events.append(self._build_event(
+                    GitHubEvent,
+                    context,
+                    event_type,
+                    time,
+                    rule["template"].copy(),  # Use template with potential randomization
+                    repo=self.rng.choice(self.repos),
+                    actor=self.rng.choice(self.actors)
+                ))
+        return events
+    
+    def generate_batch(
+        self,
+        start: datetime,
+        end: datetime,
+        seed: Optional[int] = None,
+        chunk: timedelta = timedelta(days=1),
+        compact: bool = False
+    ) -> Iterator[Union[GitHubEvent, CompactEvent]]:
+        """
+        Generate all events for the minutes in [start, end] using NumPy.
+
+        Firing decisions, repo picks and actor picks are drawn as arrays for a
+        whole chunk of minutes at once, and only the hits are turned into
+        events. Every rule fires independently each minute, with the same
+        per-minute distribution as `generate_event` at one-minute resolution.
+        Output is reproducible for a given seed and chunk length.
+
+        Args:
+            start: First minute of the window
+            end: Last minute of the window (inclusive)
+            seed: Seed for the NumPy generator; drawn from the source's RNG
+                when omitted
+            chunk: How much of the window to draw per array batch
+            compact: Yield CompactEvents instead of GitHubEvents
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("GitHubSource.generate_batch requires numpy: pip install numpy") from e
+        
+        if seed is None:
+            seed = self.rng.getrandbits(63)
+        rng = np.random.default_rng(seed)
+        event_types = [sys.intern(event_type) for event_type in self.rules]
+        rules = [self.rules[event_type] for event_type in event_types]
+        rate_mask = np.array(["rate" in rule for rule in rules])
+        rates = np.array([rule.get("rate", 0.0) for rule in rules], dtype=float)
+        probabilities = np.array([rule.get("probability", 0.1) for rule in rules], dtype=float)
+        
+        total_minutes = (end - start) // MINUTE + 1
+        chunk_minutes = max(1, chunk // MINUTE)
+        for chunk_start in range(0, total_minutes, chunk_minutes):
+            n_minutes = min(chunk_minutes, total_minutes - chunk_start)
+            shape = (n_minutes, len(rules))
+            counts = (rng.random(shape) < probabilities).astype(np.int64)
+            if rate_mask.any():
+                counts[:, rate_mask] = rng.poisson(rates[rate_mask], size=(n_minutes, int(rate_mask.sum())))
+            
+            # Row-major order keeps hits sorted by minute, then by rule
+            flat = counts.ravel()
+            hit_cells = np.repeat(np.arange(flat.size), flat)
+            minutes = hit_cells // len(rules) + chunk_start
+            rule_indices = hit_cells % len(rules)
+            repo_picks = rng.integers(len(self.repos), size=hit_cells.size)
+            actor_picks = rng.integers(len(self.actors), size=hit_cells.size)
+            
+            for minute, rule_index, repo_pick, actor_pick in zip(
+                minutes.tolist(), rule_indices.tolist(), repo_picks.tolist(), actor_picks.tolist()
+            ):
+                if compact:
+                    yield CompactEvent(
+                        self.name,
+                        event_types[rule_index],
+                        start + timedelta(minutes=minute),
+                        rules[rule_index]["template"].copy(),
+                        {"repo": self.repos[repo_pick], "actor": self.actors[actor_pick]},
+                        GitHubEvent
+                    )
+                    continue
+                yield GitHubEvent.model_construct(
                     source=self.name,
-                    event_type=event_type,
-                    timestamp=time,
-                    repo=random.choice(self.repos),
-                    actor=random.choice(self.actors),
-                    data=rule["template"].copy()  # Use template with potential randomization
+                    event_type=event_types[rule_index],
+                    timestamp=start + timedelta(minutes=minute),
+                    repo=self.repos[repo_pick],
+                    actor=self.actors[actor_pick],
+                    data=rules[rule_index]["template"].copy(),
+                    metadata={}
                 )
-        return None
     
     def _should_generate(self, time: datetime, probability: float) -> bool:
-        import random
-        return random.random() < probability 
\ No newline at end of file
+        return self.rng.random() < probability
+
+    def _fire_count(self, time: datetime, rule: Dict[str, Any], resolution: timedelta) -> int:
+        """Count how many times a rule fires in a tick of the given length."""
+        minutes = resolution / MINUTE
+        if "rate" in rule:
+            return _poisson(self.rng, rule["rate"] * minutes)
+        probability = rule.get("probability", 0.1)
+        if minutes == 1:
+            return int(self._should_generate(time, probability))
+        if minutes < 1:
+            return int(self._should_generate(time, 1 - (1 - probability) ** minutes))
+        # Skip between successes instead of drawing once per minute
+        count = 0
+        elapsed = _geometric(self.rng, probability)
+        while elapsed is not None and elapsed <= minutes:
+            count += 1
+            elapsed += _geometric(self.rng, probability)
+        return count
+
+    def next_event_time(self, after: datetime, context: Dict) -> Optional[datetime]:
+        """
+        Draw inter-arrival times for each rule and return the earliest.
+
+        Every rule fires independently, so the gap to its next firing is
+        geometric in minutes for `probability` rules and exponential for
+        `rate` rules. Pending firing times are kept in `context["schedule"]`
+        and only redrawn once they have passed.
+        """
+        schedule = context.setdefault("schedule", {})
+        for event_type, rule in self.rules.items():
+            due = schedule.get(event_type, after)
+            if due is not None and due <= after:
+                if "rate" in rule:
+                    gap = self.rng.expovariate(rule["rate"]) if rule["rate"] > 0 else None
+                else:
+                    gap = _geometric(self.rng, rule.get("probability", 0.1))
+                schedule[event_type] = after + timedelta(minutes=gap) if gap else None
+        pending = [due for due in schedule.values() if due is not None]
+        return min(pending) if pending else None
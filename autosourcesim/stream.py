@@ -1,7 +1,25 @@
+import heapq
+import random
+from collections.abc import Iterator as IteratorABC
 from datetime import datetime, timedelta
-from typing import List, Iterator, Optional
-from .sources import EventSource
-from .events import BaseEvent
+from typing import Any, AsyncIterator, Callable, List, Iterator, Optional, Dict, Union
+from .sources import EventSource, EventBatch
+from .events import BaseEvent, CompactEvent
+from .profiling import Profiler
+from .rng import derive_seed
+
+STREAM_MODES = ("tick", "scheduled")
+
+def _as_batch(result: EventBatch) -> Iterator[Union[BaseEvent, CompactEvent]]:
+    """Normalize a source result (None, one event or a batch) into an iterator."""
+    if result is None:
+        return iter(())
+    # CompactEvent is itself a tuple, so check for it before batches
+    if isinstance(result, CompactEvent):
+        return iter((result,))
+    if isinstance(result, (list, tuple, IteratorABC)):
+        return iter(result)
+    return iter((result,))
 
 class EventStream:
     """
@@ -10,47 +28,195 @@ class EventStream:
     Args:
         start_time: When to start generating events from
         duration: How long to generate events for
-        seed: Optional random seed for reproducibility
+        seed: Optional random seed for reproducibility. Each unseeded source
+            gets its own substream derived from it, so streams never touch
+            the global random state
+        mode: "tick" asks every source for events once per tick; "scheduled"
+            jumps straight to the next time any source reports it will fire
+        resolution: Default tick length; sources may override it with their
+            own `resolution`
+        compact: Emit lightweight `CompactEvent`s instead of validated
+            pydantic events; convert with `CompactEvent.to_model()` if needed
+        seekable: Reseed each source's RNG from (seed, source, time) before
+            every tick and schedule draw, so `run` can start at any time and
+            produce the same events a full run would. Needs a seed
+        profiler: Optional `Profiler` recording heap pushes and pops, and
+            per-source `generate_event`, `update_context` and (in scheduled
+            mode) `next_event_time` calls; events are counted per
+            (source, event) under "emit"
     """
     def __init__(
         self,
         start_time: datetime,
         duration: timedelta,
-        seed: Optional[int] = None
+        seed: Optional[int] = None,
+        mode: str = "tick",
+        resolution: timedelta = timedelta(minutes=1),
+        compact: bool = False,
+        seekable: bool = False,
+        profiler: Optional[Profiler] = None
     ):
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Unknown stream mode: {mode}")
+        if resolution <= timedelta(0):
+            raise ValueError("Stream resolution must be positive")
         self.start_time = start_time
         self.end_time = start_time + duration
+        self.mode = mode
+        self.resolution = resolution
+        self.compact = compact
+        self.seed = seed
+        self.seekable = seekable
+        self.profiler = profiler
         self.sources: List[EventSource] = []
-        
-        if seed is not None:
-            import random
-            random.seed(seed)
     
     def add_source(self, source: EventSource) -> None:
         """Add an event source to the stream."""
+        if self.seed is not None and source.seed is None:
+            source.rng = self.substream(len(self.sources))
         self.sources.append(source)
     
-    def run(self) -> Iterator[BaseEvent]:
+    def substream(self, key: Union[int, str]) -> random.Random:
+        """
+        Split off an independent RNG for `key` from the stream's seed.
+        
+        Seeds are derived with `derive_seed`, like the substreams of
+        `sim`, so a substream is the same in every process, which makes it
+        safe to hand to threads or worker processes.
+        """
+        if self.seed is None:
+            return random.Random()
+        return random.Random(derive_seed(self.seed, key))
+    
+    def run(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[Union[BaseEvent, CompactEvent]]:
         """
         Run the simulation and generate events.
         
+        Sources are kept on a heap keyed by their next tick (or, in scheduled
+        mode, their next reported firing time). All sources due at the same
+        time are asked in the order they were added, and each may return a
+        batch of events for that tick.
+        
+        A seekable stream can be run for a window [start, end) only. Ticks
+        before the window are skipped without calling the sources; in
+        scheduled mode only `next_event_time` is replayed up to the window.
+        Events match a full run as long as sources draw from their `rng`
+        and do not depend on context built from earlier events (such as
+        PostHog's `prev_data`, which starts empty at the window).
+        
         Yields:
             Events in chronological order from all sources.
         """
-        # Initialize source contexts
-        contexts = {source: {} for source in self.sources}
-        
-        # Current time pointer
-        current_time = self.start_time
-        
-        while current_time <= self.end_time:
-            # Get next event from each source
-            for source in self.sources:
-                event = source.generate_event(current_time, contexts[source])
-                if event:
-                    yield event
-                    # Update source context
-                    contexts[source] = source.update_context(event, contexts[source])
+        if (start is not None or end is not None) and not self.seekable:
+            raise ValueError("Running a window needs a seekable stream")
+        window_start = max(start, self.start_time) if start is not None else self.start_time
+        
+        # Initialize source contexts with each source's effective tick length
+        contexts = {
+            source: {"resolution": source.resolution or self.resolution, "compact": self.compact}
+            for source in self.sources
+        }
+        
+        # Bind each source's hooks once, reseeded and instrumented only when asked to
+        profiler = self.profiler
+        generate = [source.generate_event for source in self.sources]
+        update = [source.update_context for source in self.sources]
+        next_time_of = [source.next_event_time for source in self.sources]
+        pop = heapq.heappop
+        if self.seekable:
+            for index, source in enumerate(self.sources):
+                generate[index] = self._seeded(index, "events", generate[index])
+                next_time_of[index] = self._seeded(index, "schedule", next_time_of[index])
+        if profiler is not None:
+            for index, source in enumerate(self.sources):
+                generate[index] = profiler.wrap("generate_event", generate[index], source.name)
+                update[index] = profiler.wrap("update_context", update[index], source.name)
+                if self.mode == "scheduled":
+                    next_time_of[index] = profiler.wrap("next_event_time", next_time_of[index], source.name)
+            pop = profiler.wrap("heap.pop", pop)
+        
+        queue = []
+        for index, source in enumerate(self.sources):
+            resolution = contexts[source]["resolution"]
+            if self.mode == "scheduled":
+                next_time = next_time_of[index](self.start_time - resolution, contexts[source])
+                # Replay the schedule, but not the events, up to the window
+                while next_time is not None and next_time < window_start:
+                    next_time = next_time_of[index](next_time, contexts[source])
+            else:
+                # First tick on the source's grid inside the window
+                next_time = self.start_time + -(-(window_start - self.start_time) // resolution) * resolution
+            self._schedule(queue, index, next_time, end)
+        
+        while queue:
+            current_time, index = pop(queue)
+            source = self.sources[index]
+            for event in _as_batch(generate[index](current_time, contexts[source])):
+                if profiler is not None:
+                    profiler.record("emit", 0.0, (source.name, event.event_type))
+                yield event
+                # Update source context
+                contexts[source] = update[index](event, contexts[source])
             
-            # Move time forward
-            current_time += timedelta(minutes=1)  # Can be configurable 
\ No newline at end of file
+            # Move this source's time forward
+            if self.mode == "scheduled":
+                next_time = next_time_of[index](current_time, contexts[source])
+            else:
+                next_time = current_time + contexts[source]["resolution"]
+            self._schedule(queue, index, next_time, end)
+    
+    def arun(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        **options: Any
+    ) -> AsyncIterator[Union[BaseEvent, CompactEvent]]:
+        """
+        Run the simulation as an async iterator.
+        
+        `run` executes in a background thread and hands events over through
+        a bounded queue; see `autosourcesim.aio.astream` for the
+        "flood"/"replay" modes and backpressure options.
+        
+        Example:
+            async for event in stream.arun(mode="replay", speed=60):
+                await client.send(event)
+        """
+        from .aio import astream
+        return astream(self.run(start, end), **options)
+    
+    def _seeded(self, index: int, purpose: str, hook: Callable) -> Callable:
+        """Wrap a source hook to reseed the source's RNG from the time it is called for."""
+        source = self.sources[index]
+        if source.seed is not None:
+            base = (source.seed, purpose)
+        elif self.seed is not None:
+            base = (self.seed, index, purpose)
+        else:
+            raise ValueError("Seekable streams need a seed for the stream or every source")
+        rng = source.rng
+        
+        def seeded(time: datetime, context: Dict) -> Any:
+            rng.seed(derive_seed(*base, time.isoformat()))
+            return hook(time, context)
+        
+        return seeded
+    
+    def _schedule(
+        self,
+        queue: list,
+        index: int,
+        next_time: Optional[datetime],
+        end: Optional[datetime] = None
+    ) -> None:
+        """Push a source's next firing time if it falls inside the stream (and run window)."""
+        if next_time is not None and next_time <= self.end_time and (end is None or next_time < end):
+            if self.profiler is None:
+                heapq.heappush(queue, (next_time, index))
+                return
+            with self.profiler.timed("heap.push"):
+                heapq.heappush(queue, (next_time, index))
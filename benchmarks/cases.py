@@ -0,0 +1,222 @@
+"""
+Benchmark cases for both generation engines.
+
+Every case is a function returning an iterable; the runner times how long it
+takes to exhaust it and to produce its first item. Cases are registered with
+`benchmark`, once per parameter combination. A case's optional fixture is a
+context manager that turns its parameters into the function's arguments,
+doing setup and teardown outside the timed run.
+"""
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Literal, NamedTuple, Optional
+
+import yaml
+from pydantic import BaseModel, Field
+
+from autosourcesim import EventStream, GitHubSource, PostHogSource
+from sim.engine import SimulationEngine
+from sim.registry import EventRegistry, register_schema
+from sim.rule_resolver import RuleResolver
+from sim.story_cache import StoryCache
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STORY_DIRS = [
+    REPO_ROOT / "examples" / "sim" / "stories",
+    REPO_ROOT / "sim" / "stories",
+    REPO_ROOT / "benchmarks" / "stories",
+]
+
+START = datetime(2025, 1, 1)
+SEED = 42
+
+Fixture = Callable[..., ContextManager[Dict[str, Any]]]
+
+class Case(NamedTuple):
+    """A registered benchmark: its name, group, parameters, body and optional fixture."""
+    name: str
+    group: str
+    params: Dict[str, Any]
+    func: Callable[..., Iterable[Any]]
+    fixture: Optional[Fixture] = None
+
+CASES: List[Case] = []
+
+def benchmark(group: str, fixture: Optional[Fixture] = None, **params: Any) -> Callable:
+    """Register a case function for one combination of parameters."""
+    def register(func: Callable[..., Iterable[Any]]) -> Callable[..., Iterable[Any]]:
+        suffix = "-".join(f"{key}={value}" for key, value in params.items())
+        name = f"{group}.{func.__name__}" + (f"[{suffix}]" if suffix else "")
+        CASES.append(Case(name, group, params, func, fixture))
+        return func
+    return register
+
+# --- Schemas of benchmarks/stories/validated.yaml ---
+
+@register_schema("bench", "metrics.reported")
+class BenchMetrics(BaseModel):
+    metric: str
+    value: int = Field(ge=0, le=100)
+    ratio: float
+    host: str
+    environment: str
+
+class BenchItem(BaseModel):
+    sku: str
+    quantity: int = Field(ge=1)
+
+@register_schema("bench", "order.created")
+class BenchOrder(BaseModel):
+    order_id: str
+    amount: int = Field(gt=0)
+    currency: Literal["USD", "EUR"]
+    status: Literal["pending", "completed"]
+    items: List[BenchItem]
+
+# --- autosourcesim.EventStream ---
+
+def _posthog_source():
+    rng = random.Random(SEED)
+    return PostHogSource(
+        org_id="bench",
+        rules={
+            "usage.metrics": {
+                "frequency": "1m",
+                "data": {
+                    "active_users": lambda _: rng.randint(80, 200),
+                    "previous_period": lambda prev: prev.get("active_users", 100),
+                }
+            }
+        }
+    )
+
+def _github_source(probability: float):
+    return GitHubSource(
+        repos=[f"bench/repo{i}" for i in range(10)],
+        actors=[f"user{i}" for i in range(50)],
+        rules={
+            "push": {"probability": probability, "template": {"branch": "main"}},
+            "pull_request": {"probability": probability / 2, "template": {"action": "opened"}},
+        }
+    )
+
+def _stream(days: int, mode: str, *sources):
+    stream = EventStream(start_time=START, duration=timedelta(days=days), seed=SEED, mode=mode)
+    for source in sources:
+        stream.add_source(source)
+    return stream.run()
+
+def stream_posthog(days: int) -> Iterable[Any]:
+    return _stream(days, "tick", _posthog_source())
+
+def stream_github(days: int, probability: float, mode: str) -> Iterable[Any]:
+    return _stream(days, mode, _github_source(probability))
+
+def stream_github_batch(days: int, probability: float) -> Iterable[Any]:
+    source = _github_source(probability)
+    return source.generate_batch(START, START + timedelta(days=days) - timedelta(minutes=1), seed=SEED)
+
+for days in (1, 7):
+    benchmark("stream", days=days)(stream_posthog)
+    for probability in (0.01, 0.1, 0.5):
+        for mode in ("tick", "scheduled"):
+            benchmark("stream", days=days, probability=probability, mode=mode)(stream_github)
+        benchmark("stream", days=days, probability=probability)(stream_github_batch)
+
+# --- sim.SimulationEngine ---
+
+def _scaled_stories(factor: int) -> Path:
+    """Copy the bundled stories with every `repeat` multiplied by `factor`."""
+    target = Path(tempfile.mkdtemp(prefix="autosource-bench-"))
+    for index, story_dir in enumerate(STORY_DIRS):
+        for path in story_dir.rglob("*.yaml"):
+            story = yaml.safe_load(path.read_text())
+            for event in story.get("events", []):
+                event["repeat"] = (event.get("repeat") or 1) * factor
+            destination = target / str(index) / path.relative_to(story_dir)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            destination.write_text(yaml.safe_dump(story, sort_keys=False))
+    return target
+
+@contextmanager
+def scaled_story(story: str, factor: int, **params: Any) -> Iterator[Dict[str, Any]]:
+    """Fixture passing the path of a scaled copy of `story`, deleted afterwards."""
+    root = _scaled_stories(factor)
+    try:
+        yield {"path": str(next(root.rglob(story))), **params}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def story_stream(path: str, validation: str, vectorize: bool = False) -> Iterable[Any]:
+    engine = SimulationEngine(validation=validation, seed=SEED, story_cache=StoryCache(), vectorize=vectorize)
+    return engine.stream_story(path)
+
+def story_columns(path: str, validation: str, vectorize: bool) -> Iterable[Any]:
+    """Stream column batches, counting their rows as events."""
+    engine = SimulationEngine(validation=validation, seed=SEED, story_cache=StoryCache(), vectorize=vectorize)
+    for batch in engine.stream_columns(path):
+        yield from batch.timestamps
+
+# Only the benchmark story has schemas available everywhere, so the bundled
+# stories run without validation. e_commerce/sales.yaml covers includes and
+# follow-up events
+STORIES = (
+    "validated.yaml",
+    "user_activity.yaml",
+    "system_metrics.yaml",
+    "onboarding_flow.yaml",
+    "e_commerce/sales.yaml",
+)
+
+for factor in (1, 100, 1000):
+    benchmark("story", scaled_story, story="validated.yaml", factor=factor, validation="full")(story_stream)
+for story in STORIES:
+    benchmark("story", scaled_story, story=story, factor=1000, validation="off")(story_stream)
+
+for vectorize in (False, True):
+    params = dict(story="system_metrics.yaml", factor=10000, validation="off", vectorize=vectorize)
+    benchmark("story", scaled_story, **params)(story_stream)
+    benchmark("columns", scaled_story, **params)(story_columns)
+
+# --- Rule resolution and validation on their own ---
+
+RESOLVER_DATA = {
+    "metric": "cpu_usage",
+    "value": "random(10, 90)",
+    "ratio": "random(0.1, 0.4)",
+    "host": "web-server-1",
+    "tags": [{"name": "static(env)", "value": "random(1, 3)"}],
+    "nested": {"count": "random(1, 100)", "label": "static(ok)"},
+}
+
+METRICS_DATA = {
+    "metric": "cpu_usage",
+    "value": 50,
+    "ratio": 0.25,
+    "host": "web-server-1",
+    "environment": "production",
+}
+
+def resolve_data(iterations: int) -> Iterable[Any]:
+    resolver = RuleResolver(rng=random.Random(SEED))
+    return (resolver.resolve_data(RESOLVER_DATA) for _ in range(iterations))
+
+def compile_data(iterations: int) -> Iterable[Any]:
+    generate = RuleResolver(rng=random.Random(SEED)).compile_data(RESOLVER_DATA)
+    return (generate() for _ in range(iterations))
+
+def validate_data(iterations: int) -> Iterable[Any]:
+    registry = EventRegistry()
+    return (
+        registry.validate_data("bench", "metrics.reported", METRICS_DATA)
+        for _ in range(iterations)
+    )
+
+for iterations in (100_000,):
+    benchmark("rules", iterations=iterations)(resolve_data)
+    benchmark("rules", iterations=iterations)(compile_data)
+    benchmark("validation", iterations=iterations)(validate_data)
@@ -0,0 +1,56 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.1]
+
+Exits with status 1 when any case got slower, or used more memory, by more
+than the threshold.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    return {result["name"]: result for result in report["results"] if result["status"] == "ok"}
+
+def _change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    """Relative change from `before` to `after`, or None when either is missing or zero."""
+    if not before or after is None:
+        return None
+    return after / before - 1
+
+def _format(change: Optional[float], width: int) -> str:
+    return f"{change:>+{width}.1%}" if change is not None else f"{'n/a':>{width}}"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    baseline = _load(args.baseline)
+    current = _load(args.current)
+    regressions = 0
+    print(f"{'case':<70} {'events/s':>12} {'first':>8} {'rss':>8}")
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name], current[name]
+        throughput = _change(before["events_per_sec"], after["events_per_sec"])
+        first = _change(before["time_to_first_event"], after["time_to_first_event"])
+        rss = _change(before["peak_rss_mb"], after["peak_rss_mb"])
+        regressed = (throughput is not None and throughput < -args.threshold) \
+            or (rss is not None and rss > args.threshold)
+        regressions += regressed
+        print(
+            f"{name:<70} {_format(throughput, 12)} {_format(first, 8)} {_format(rss, 8)}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    for name in sorted(baseline.keys() ^ current.keys()):
+        print(f"{name:<70} only in {'baseline' if name in baseline else 'current'}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
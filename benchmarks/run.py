@@ -0,0 +1,142 @@
+"""
+Run the benchmark cases and write the results as JSON.
+
+Each case runs in a fresh process so its peak RSS is its own. Usage:
+
+    python -m benchmarks.run [-k FILTER] [-o results.json] [--rounds N]
+
+Exits with status 1 when any case failed. Compare two result files with
+`python -m benchmarks.compare`.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.cases import CASES, REPO_ROOT
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _measure(index: int, connection) -> None:
+    """Run one case in this (child) process and send back its measurements."""
+    case = CASES[index]
+    try:
+        # Fixture setup and teardown stay out of the timed run
+        with case.fixture(**case.params) if case.fixture else nullcontext(case.params) as arguments:
+            start = time.perf_counter()
+            first = None
+            count = 0
+            for _ in case.func(**arguments):
+                if first is None:
+                    first = time.perf_counter() - start
+                count += 1
+            elapsed = time.perf_counter() - start
+        connection.send({
+            "status": "ok",
+            "events": count,
+            "seconds": elapsed,
+            "events_per_sec": count / elapsed if elapsed else None,
+            "time_to_first_event": first,
+            "peak_rss_mb": _peak_rss_mb(),
+        })
+    except Exception as e:
+        connection.send({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+def run_case(index: int) -> Dict[str, Any]:
+    """Run a case in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure, args=(index, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {"status": "error", "error": f"process exited with code {process.exitcode}"}
+    process.join()
+    return result
+
+def _best(rounds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keep the fastest round, with the highest peak RSS seen in any round."""
+    ok = [result for result in rounds if result["status"] == "ok"]
+    if not ok:
+        return rounds[-1]
+    best = dict(min(ok, key=lambda result: result["seconds"]))
+    best["rounds"] = len(ok)
+    peaks = [result["peak_rss_mb"] for result in ok if result["peak_rss_mb"] is not None]
+    best["peak_rss_mb"] = max(peaks) if peaks else None
+    return best
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("-o", "--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--rounds", type=int, default=1, help="Runs per case; the fastest is kept")
+    parser.add_argument("--list", action="store_true", help="List case names and exit")
+    args = parser.parse_args(argv)
+
+    selected = [index for index, case in enumerate(CASES) if args.filter in case.name]
+    if args.list:
+        for index in selected:
+            print(CASES[index].name)
+        return 0
+
+    results = []
+    for index in selected:
+        case = CASES[index]
+        result = _best([run_case(index) for _ in range(args.rounds)])
+        results.append({"name": case.name, "group": case.group, "params": case.params, **result})
+        if result["status"] == "ok":
+            print(
+                f"{case.name}: {result['events']} events, {result['events_per_sec']:,.0f}/s, "
+                f"first {result['time_to_first_event'] or 0:.4f}s, peak {result['peak_rss_mb'] or 0:.1f} MiB",
+                file=sys.stderr
+            )
+        else:
+            print(f"{case.name}: {result['error']}", file=sys.stderr)
+
+    report = {
+        "commit": _git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 1 if any(result["status"] != "ok" for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@ from datetime import datetime, timedelta
 from autosourcesim import EventStream, PostHogSource, GitHubSource
 
 def main():
+    # Rule functions draw from their own RNG; the stream seeds only its sources
+    rng = random.Random(42)
+
     # Create a stream for the next 24 hours
     stream = EventStream(
         start_time=datetime.now(),
@@ -17,7 +20,7 @@ def main():
             "usage.metrics": {
                 "frequency": "1h",
                 "data": {
-                    "active_users": lambda _: random.randint(80, 200),
+                    "active_users": lambda _: rng.randint(80, 200),
                     "previous_period": lambda prev: prev.get("active_users", 100),
                     "percent_change": lambda curr, prev: (
                         (curr["active_users"] - prev.get("active_users", 100))
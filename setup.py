@@ -13,6 +13,15 @@ setup(
         "rich>=13.7.0",
     ],
     extras_require={
+        "fast": [
+            "numpy>=1.24.0",
+        ],
+        "arrow": [
+            "pyarrow>=14.0.0",
+        ],
+        "zstd": [
+            "zstandard>=0.22.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=22.0.0",
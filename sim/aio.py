@@ -0,0 +1,5 @@
+# The thread/queue bridge lives in autosourcesim, so EventStream can use it
+# without depending on sim
+from autosourcesim.aio import DEFAULT_CHUNK_SIZE, DEFAULT_QUEUE_SIZE, STREAM_PACING, astream
+
+__all__ = ["astream", "STREAM_PACING", "DEFAULT_QUEUE_SIZE", "DEFAULT_CHUNK_SIZE"]
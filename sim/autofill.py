@@ -0,0 +1,203 @@
+import enum
+import math
+import struct
+from datetime import date, datetime
+from typing import Any, Collection, Dict, List, Literal, Optional, Tuple, Type, Union, get_args, get_origin
+from uuid import UUID
+
+from pydantic import BaseModel
+from typing_extensions import Annotated
+
+from .config import DataRule
+from .rule_resolver import DataPlan, ListPlan, step_range
+from .text_pools import DEFAULT_POOL_SIZE
+
+try:
+    from math import nextafter
+except ImportError:  # Python < 3.9
+    def nextafter(x: float, y: float) -> float:
+        """Next float after `x` towards `y`."""
+        if x == y or x != x:
+            return y
+        if x == 0:
+            return math.copysign(5e-324, y)
+        bits = struct.unpack("<q", struct.pack("<d", x))[0]
+        bits += 1 if (y > x) == (x > 0) else -1
+        return struct.unpack("<d", struct.pack("<q", bits))[0]
+
+# Value ranges of numbers without bounds, or with only one of them
+DEFAULT_INT_RANGE = (0, 1000)
+DEFAULT_FLOAT_RANGE = (0.0, 1.0)
+
+# Text pool categories by words in field names; other strings are words
+_TEXT_CATEGORIES = [
+    ("email", "email"),
+    ("url", "url"),
+    ("company", "company"),
+    ("user_name", "user_name"),
+    ("username", "user_name"),
+    ("name", "name"),
+    ("title", "sentence"),
+    ("description", "sentence"),
+    ("message", "sentence"),
+]
+
+def plan_schema(
+    schema: Type[BaseModel],
+    required_only: bool = True,
+    exclude: Collection[str] = ()
+) -> DataPlan:
+    """
+    Compile a pydantic schema into a data plan generating valid values.
+
+    Each field becomes a rule from its type and constraints: bounded
+    `random` numbers, `choice` for booleans, Literals and Enums,
+    `random_text` sampled from a text pool for strings (by field name, e.g.
+    "email" fields get emails), `datetime` for datetimes and dates, `uuid4`
+    for UUIDs, and nested plans for nested models. Number bounds (with
+    `gt`/`lt` excluded), `multiple_of` and string lengths are respected.
+    Lists get their `min_length` items, and lists of models at least one.
+    Optional types are generated as their inner type.
+
+    With `required_only`, fields with defaults are left to validation to
+    fill in. Fields named (by alias) in `exclude` are skipped, so only
+    fields that are actually generated must have a supported type; others
+    raise a ValueError.
+    """
+    template: Dict[str, Any] = {}
+    fields: List[Tuple[str, Any]] = []
+    for name, info in schema.model_fields.items():
+        if required_only and not info.is_required():
+            continue
+        if (info.alias or name) in exclude:
+            continue
+        try:
+            field_plan = _plan_type(name, info.annotation, list(info.metadata), required_only)
+        except ValueError as e:
+            raise ValueError(f"Cannot generate {schema.__name__}.{name}: {e}") from None
+        template[info.alias or name] = None
+        fields.append((info.alias or name, field_plan))
+    return DataPlan(template, fields)
+
+def fill_missing(plan: DataPlan, fill: DataPlan) -> DataPlan:
+    """Add the fields of `fill` that `plan` does not set, after its own."""
+    missing = [(key, field_plan) for key, field_plan in fill.fields if key not in plan.template]
+    if not missing:
+        return plan
+    template = dict(plan.template)
+    template.update((key, fill.template[key]) for key, _ in missing)
+    return DataPlan(template, plan.fields + missing)
+
+def _plan_type(name: str, annotation: Any, metadata: List[Any], required_only: bool) -> Any:
+    """Build the rule or nested plan generating values of one type."""
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        annotation, *extra = get_args(annotation)
+        return _plan_type(name, annotation, metadata + extra, required_only)
+    if origin is Union:
+        options = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _plan_type(name, options[0], metadata, required_only)
+    if origin is Literal:
+        return DataRule(type="choice", args=list(get_args(annotation)))
+    if origin is list:
+        item_type = get_args(annotation)[0] if get_args(annotation) else Any
+        size = _constraint(metadata, "min_length") or 0
+        if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+            max_length = _constraint(metadata, "max_length")
+            size = max(size, 1) if max_length is None else min(max(size, 1), max_length)
+        if not size:
+            return ListPlan([], [])
+        item_plan = _plan_type(name, item_type, [], required_only)
+        return ListPlan([None] * size, [item_plan] * size)
+    if origin is dict:
+        return DataPlan({}, [])
+
+    if annotation is datetime:
+        return DataRule(type="datetime")
+    if annotation is date:
+        return DataRule(type="datetime", kwargs={"format": "%Y-%m-%d"})
+    if annotation is UUID:
+        return DataRule(type="uuid4")
+    if annotation is bool:
+        return DataRule(type="choice", args=[True, False])
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return DataRule(type="choice", args=[member.value for member in annotation])
+    if annotation is int:
+        return _plan_number(metadata, DEFAULT_INT_RANGE, int)
+    if annotation is float:
+        return _plan_number(metadata, DEFAULT_FLOAT_RANGE, float)
+    if annotation is str:
+        return _plan_text(name, metadata)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return plan_schema(annotation, required_only)
+    raise ValueError(f"unsupported type {annotation!r}")
+
+def _constraint(metadata: List[Any], name: str) -> Optional[Any]:
+    """Get a constraint (ge, max_length, ...) from field metadata, if set."""
+    for item in metadata:
+        value = getattr(item, name, None)
+        if value is not None:
+            return value
+    return None
+
+def _plan_number(metadata: List[Any], default: Tuple[Any, Any], kind: type) -> DataRule:
+    """Draw bounded random numbers, only multiples of `multiple_of` if set."""
+    low, high = _bounds(metadata, default, kind)
+    if kind is int:
+        low, high = math.ceil(low), math.floor(high)
+    low, high = kind(low), kind(high)
+    multiple_of = _constraint(metadata, "multiple_of")
+    if multiple_of is None:
+        return DataRule(type="random", args=[low, high])
+    # Fail at planning time when no multiple fits
+    step_range(low, high, kind(multiple_of))
+    return DataRule(type="random", args=[low, high], kwargs={"step": kind(multiple_of)})
+
+def _bounds(metadata: List[Any], default: Tuple[Any, Any], kind: type) -> Tuple[Any, Any]:
+    """
+    Inclusive range satisfying a number's ge/gt/le/lt constraints.
+
+    Exclusive bounds move inward, by 1 for integers and to the next float
+    for floats.
+    """
+    low = _constraint(metadata, "ge")
+    if low is None and _constraint(metadata, "gt") is not None:
+        low = _exclude(_constraint(metadata, "gt"), math.inf, kind)
+    high = _constraint(metadata, "le")
+    if high is None and _constraint(metadata, "lt") is not None:
+        high = _exclude(_constraint(metadata, "lt"), -math.inf, kind)
+    span = default[1] - default[0]
+    if low is None and high is None:
+        return default
+    # Keep the default range when the one bound allows it, else shift it
+    if low is None:
+        low = default[0] if default[0] <= high else high - span
+    if high is None:
+        high = default[1] if default[1] >= low else low + span
+    if low > high:
+        raise ValueError(f"no number between {low} and {high}")
+    return low, high
+
+def _exclude(bound: Any, direction: float, kind: type) -> Any:
+    """Closest value past an exclusive bound, towards `direction`."""
+    if kind is int:
+        return math.floor(bound) + 1 if direction > 0 else math.ceil(bound) - 1
+    return nextafter(float(bound), direction)
+
+def _plan_text(name: str, metadata: List[Any]) -> DataRule:
+    """Sample strings from a text pool, picking the category by field name."""
+    if _constraint(metadata, "pattern") is not None:
+        raise ValueError("strings with a pattern cannot be generated")
+    kwargs: Dict[str, Any] = {"cardinality": DEFAULT_POOL_SIZE}
+    max_length = _constraint(metadata, "max_length")
+    min_length = _constraint(metadata, "min_length")
+    if min_length:
+        # Short values are repeated to the length
+        kwargs["min_length"] = min_length
+    if max_length is not None:
+        # Truncated emails or URLs would be no more valid than words
+        kwargs["max_length"] = max_length
+        return DataRule(type="random_text", args=["word"], kwargs=kwargs)
+    lowered = name.lower()
+    category = next((pool for word, pool in _TEXT_CATEGORIES if word in lowered), "word")
+    return DataRule(type="random_text", args=[category], kwargs=kwargs)
@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .config import DataRule
+from .rule_resolver import ONBOARDING_TEMPLATES, DataPlan, RuleResolver, step_range
+from .text_pools import TextPool, get_text_pool
+
+# Rows drawn per NumPy call. Every block of a shard draws a full block from
+# its own generator, so values never depend on where a window cuts a shard
+VECTOR_BLOCK = 1024
+
+# Rules that can be drawn as whole columns
+VECTOR_RULES = frozenset({"random", "static", "tenant", "random_text", "choice"})
+
+# Draws the varying columns of a block: draw(generator, size) -> {field: array}
+ColumnDrawer = Callable[[Any, int], Dict[str, Any]]
+
+class ColumnBatch(NamedTuple):
+    """
+    Consecutive repetitions of one spec for one org, stored column by column.
+
+    `template` holds every data field in order, with the values of constant
+    fields; `columns` holds one array or list per varying field. Timestamps
+    of uniform arrivals without jitter are a `sim.timing.UniformTimes`.
+    """
+    source: str
+    event: str
+    org_id: str
+    timestamps: Sequence[datetime]
+    template: Dict[str, Any]
+    columns: Dict[str, Sequence[Any]]
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.timestamps)
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Assemble the data dict of each row, lazily."""
+        template = self.template
+        if not self.columns:
+            for _ in range(self.num_rows):
+                yield template.copy()
+            return
+        names = list(self.columns)
+        values = [
+            column.tolist() if hasattr(column, "tolist") else column
+            for column in self.columns.values()
+        ]
+        for row in zip(*values):
+            data = template.copy()
+            data.update(zip(names, row))
+            yield data
+
+    @classmethod
+    def from_rows(
+        cls,
+        source: str,
+        event: str,
+        org_id: str,
+        timestamps: List[datetime],
+        rows: List[Dict[str, Any]]
+    ) -> "ColumnBatch":
+        """Build a batch from data dicts sharing the same fields."""
+        names = list(rows[0]) if rows else []
+        return cls(source, event, org_id, timestamps, {}, {
+            name: [row.get(name) for row in rows] for name in names
+        })
+
+def numpy():
+    """Import NumPy, which vectorized generation requires."""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Vectorized generation requires numpy: pip install numpy") from e
+    return numpy
+
+def is_vectorizable(plan: Any, pool: Optional[TextPool] = None) -> bool:
+    """
+    Check whether a plan can be drawn as columns.
+
+    That is a flat data plan whose rules are all random numbers, constants
+    (static or tenant) or choices from a fixed set (choice, random_text
+    sampled from a text pool, or the built-in onboarding texts).
+    """
+    if not isinstance(plan, DataPlan):
+        return False
+    for _, field_plan in plan.fields:
+        if not isinstance(field_plan, DataRule) or field_plan.type not in VECTOR_RULES:
+            return False
+        if field_plan.type == "random_text":
+            category = field_plan.args[0] if field_plan.args else None
+            sampled = any(key in field_plan.kwargs for key in ("cardinality", "max_length", "min_length"))
+            if category != "onboarding" and pool is None and not sampled:
+                return False
+    return True
+
+def compile_columns(
+    plan: DataPlan,
+    params: Optional[Dict[str, Any]] = None,
+    pool: Optional[TextPool] = None
+) -> Tuple[Dict[str, Any], ColumnDrawer]:
+    """
+    Compile a vectorizable plan into its constant template and a column drawer.
+
+    Constant rules are resolved once into the template. The drawer returns
+    one NumPy array per varying field: `random` draws integers (inclusive)
+    or floats like its scalar rule, or multiples of its `step`, and choices
+    draw indices into their value list.
+    """
+    np = numpy()
+    resolver = RuleResolver(params=params, pool=pool)
+    template = dict(plan.template)
+    draws: List[Tuple[str, Callable[[Any, int], Any]]] = []
+
+    for key, rule in plan.fields:
+        if rule.type in ("static", "tenant"):
+            template[key] = resolver.resolve_rule(rule)
+        elif rule.type == "random":
+            if len(rule.args) != 2:
+                raise ValueError("Random rule requires exactly 2 arguments: min and max")
+            low, high = rule.args
+            step = rule.kwargs.get("step")
+            if step is not None:
+                low, high = step_range(low, high, step)
+                draws.append((key, lambda generator, size, low=low, high=high, step=step: generator.integers(
+                    low, high, size, endpoint=True
+                ) * step))
+            elif isinstance(low, float) or isinstance(high, float):
+                draws.append((key, lambda generator, size, low=low, high=high: generator.uniform(low, high, size)))
+            else:
+                draws.append((key, lambda generator, size, low=low, high=high: generator.integers(
+                    low, high, size, endpoint=True
+                )))
+        else:
+            if rule.type == "choice":
+                if not rule.args:
+                    raise ValueError("Choice rule requires at least 1 argument")
+                values = rule.args
+            elif len(rule.args) != 1:
+                raise ValueError("Random text rule requires exactly 1 argument: category")
+            elif rule.args[0] == "onboarding":
+                values = ONBOARDING_TEMPLATES
+            else:
+                values = (pool or get_text_pool()).get(
+                    rule.args[0],
+                    rule.kwargs.get("cardinality"),
+                    rule.kwargs.get("max_length"),
+                    rule.kwargs.get("min_length")
+                )
+            choices = np.array(values, dtype=object)
+            draws.append((key, lambda generator, size, choices=choices: choices[
+                generator.integers(len(choices), size=size)
+            ]))
+
+    def draw(generator: Any, size: int) -> Dict[str, Any]:
+        return {key: draw_column(generator, size) for key, draw_column in draws}
+
+    return template, draw
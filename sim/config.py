@@ -1,11 +1,13 @@
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Union
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 @dataclass
 class Event:
     """Core event object that represents a single activity across any source."""
+    __slots__ = ("source", "event", "org_id", "timestamp", "data")
+
     source: str
     event: str
     org_id: str
@@ -21,8 +23,41 @@ class Event:
 class DataRule(BaseModel):
     """Represents a dynamic data generation rule."""
     type: str = Field(..., description="Type of rule (random, static, random_text)")
-    args: List[Union[int, float, str]] = Field(default_factory=list)
-    kwargs: Dict[str, Union[int, float, str]] = Field(default_factory=dict)
+    # bool first, so rules built in code (e.g. choice(True, False)) keep their booleans
+    args: List[Union[bool, int, float, str]] = Field(default_factory=list)
+    kwargs: Dict[str, Union[bool, int, float, str]] = Field(default_factory=dict)
+
+# Durations are strings such as "15m", "1h30m" or "2d", or plain seconds
+Duration = Union[str, int, float]
+
+class ArrivalConfig(BaseModel):
+    """Arrival process for a spec's repetitions (see `sim.timing.spec_times`)."""
+    process: str = "uniform"
+    peak_hour: float = Field(default=14.0, ge=0, lt=24)
+    amplitude: float = Field(default=0.8, ge=0, le=1)
+    burst_size: int = Field(default=10, ge=1)
+    burst_spacing: Duration = "1s"
+
+class DelayConfig(BaseModel):
+    """Delay distribution of a follow-up event (see `sim.timing.delay_sampler`)."""
+    distribution: str = "exponential"
+    mean: Duration = "1h"
+    min: Optional[Duration] = None
+    max: Optional[Duration] = None
+    sigma: float = Field(default=0.5, gt=0, description="Shape of the lognormal distribution")
+
+class FollowUpSpec(BaseModel):
+    """An event caused by another one, scheduled after a random delay."""
+    source: Optional[str] = Field(default=None, description="Source, the parent's by default")
+    event: str
+    delay: Union[Duration, DelayConfig] = Field(default=0, description="Fixed delay or delay distribution")
+    probability: float = Field(default=1.0, ge=0, le=1)
+    share: List[str] = Field(
+        default_factory=list,
+        description="Parent data fields copied into the follow-up, e.g. shared ids"
+    )
+    data: Dict[str, Union[str, int, float, dict, list]] = Field(default_factory=dict)
+    follow_ups: List["FollowUpSpec"] = Field(default_factory=list)
 
 class EventSpec(BaseModel):
     """Specification for a single event type in a story."""
@@ -30,13 +65,43 @@ class EventSpec(BaseModel):
     event: str
     offset_days: int = Field(ge=0)
     repeat: Optional[int] = Field(default=None, ge=0)
+    every: Optional[Duration] = Field(default=None, description="Spacing between repetitions, daily by default")
+    jitter: Optional[Duration] = Field(
+        default=None,
+        description="Maximum random delay of each repetition, for uniform arrivals only"
+    )
+    duration: Optional[Duration] = Field(default=None, description="Stop repeating after this long")
+    arrival: Union[str, ArrivalConfig] = Field(default="uniform", description="Arrival process name or config")
     data: Dict[str, Union[str, int, float, dict, list]] = Field(default_factory=dict)
+    follow_ups: List[FollowUpSpec] = Field(default_factory=list, description="Events each repetition causes")
+
+    @model_validator(mode="after")
+    def _check_jitter(self) -> "EventSpec":
+        """Reject jitter for arrival processes that are random already and would ignore it."""
+        process = self.arrival if isinstance(self.arrival, str) else self.arrival.process
+        if self.jitter is not None and process != "uniform":
+            raise ValueError(f"jitter only applies to uniform arrivals, not {process}")
+        return self
+
+class TenantConfig(BaseModel):
+    """Fans a story out over many tenants (see `sim.tenants.expand_tenants`)."""
+    count: int = Field(ge=1)
+    org_id: str = Field(default="{org_id}-{index}", description="Format template for tenant org_ids")
+    params: Dict[str, Union[str, int, float]] = Field(
+        default_factory=dict,
+        description="Per-tenant parameters, as values or rules drawn once per tenant"
+    )
+    activity: Union[str, int, float] = Field(
+        default=1.0,
+        description="Per-tenant event rate multiplier, as a value or rule"
+    )
 
 class StoryConfig(BaseModel):
     """Top-level story configuration."""
     org_id: str
     start_date: datetime
     includes: Optional[List[str]] = None
+    tenants: Optional[TenantConfig] = None
     events: List[EventSpec]
 
     class Config:
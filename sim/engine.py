@@ -1,97 +1,909 @@
-import yaml
-from typing import Generator, List
-from datetime import datetime, timedelta
+import random
+import sys
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime
 import heapq
-from pathlib import Path
+from itertools import chain, count, dropwhile, groupby, islice, repeat, takewhile
+from operator import attrgetter
 
+from autosourcesim.profiling import BoundProfiler, Profiler
+
+from .autofill import fill_missing
+from .columns import VECTOR_BLOCK, ColumnBatch, compile_columns, is_vectorizable, numpy
 from .config import Event, StoryConfig, EventSpec
-from .registry import get_registry
-from .rule_resolver import RuleResolver
+from .follow_ups import FollowUpPlan, FollowUpScheduler, plan_follow_ups
+from .includes import IncludeGraph
+from .registry import VALIDATION_MODES, Validator, get_registry
+from .rng import derive_seed, random_seed, substream
+from .rule_resolver import DataPlan, RuleResolver, is_stateful
+from .story_cache import CompiledStory, StoryCache, get_story_cache
+from .tenants import Tenant, expand_tenants
+from .text_pools import TextPool, get_text_pool
+from .timing import UniformTimes, spec_times, uniform_times
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+DEFAULT_VALIDATE_FIRST = 100
+DEFAULT_SHARD_SIZE = 10_000
 
 class SimulationEngine:
-    """Main simulation engine that generates events from stories."""
+    """
+    Main simulation engine that generates events from stories.
     
-    def __init__(self):
+    Args:
+        validation: Schema validation mode, one of "full", "first-n" or "off"
+        validate_first: How many events per (source, event) to validate in
+            each run in "first-n" mode, across tenants, shards and workers.
+            Later events are not checked, only given the validated shape:
+            schema field order, defaults filled in and the field types
+            validation gives (see `EventRegistry.get_coercer`). Column
+            batches are never changed by validation
+        seed: Master seed. Every spec is expanded in fixed shards of
+            `shard_size` repetitions, each with its own RNG substream derived
+            from the master seed and its (spec, shard) index, so output is
+            identical for any worker count. A fresh seed is drawn when omitted
+        workers: Number of processes to expand shards in; 1 runs in-process
+        shard_size: Repetitions per shard
+        text_pool: Optional pool to sample text rules from instead of calling
+            Faker for every value
+        story_cache: Cache of compiled stories; the shared in-memory cache by
+            default
+        profiler: Optional profiler recording time and calls per stage:
+            "yaml.load", "includes.resolve", "rules.parse", "rules.compile",
+            "rule.<type>", "rules.vector", "validate", "generate" (producing
+            each event, rules and validation included) and "heap" (merging
+            specs into timestamp order). Shard stages are also kept per
+            (source, event), and shards expanded in worker processes are
+            merged back in
+        vectorize: Draw specs whose rules are all random numbers, constants
+            or choices from a fixed set as NumPy columns, `VECTOR_BLOCK`
+            repetitions at a time, instead of one rule call per field per
+            event. Values are deterministic for a seed but differ from the
+            scalar path's. Timestamps of uniform arrivals without jitter
+            are computed a block at a time too. `stream_columns` gains the
+            most; `stream_story` still builds and merges an Event per row.
+            Requires numpy
+        autofill: Generate the required schema fields a spec's data leaves
+            out, from a plan compiled once per (source, event) from the
+            schema's types and constraints (see `sim.autofill`). Specs of
+            event types without a schema are left as they are
+    """
+    
+    def __init__(
+        self,
+        validation: str = "full",
+        validate_first: int = DEFAULT_VALIDATE_FIRST,
+        seed: Optional[int] = None,
+        workers: int = 1,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        text_pool: Optional[TextPool] = None,
+        story_cache: Optional[StoryCache] = None,
+        profiler: Optional[Profiler] = None,
+        vectorize: bool = False,
+        autofill: bool = False
+    ):
+        if validation not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode: {validation}")
+        if workers < 1 or shard_size < 1:
+            raise ValueError("workers and shard_size must be at least 1")
         self.registry = get_registry()
-        self.rule_resolver = RuleResolver()
-        self.processed_stories = set()
-    
-    def _load_story(self, path: str) -> StoryConfig:
-        """Load and parse a story file."""
-        with open(path, 'r') as f:
-            data = yaml.safe_load(f)
-            if isinstance(data['start_date'], str):
-                data['start_date'] = datetime.fromisoformat(data['start_date'])
-        return StoryConfig(**data)
-    
-    def _resolve_includes(self, story: StoryConfig, base_path: Path) -> List[EventSpec]:
-        """Resolve and merge included stories."""
-        all_events = list(story.events)
-        
-        if story.includes:
-            for include in story.includes:
-                include_path = (base_path / include).resolve()
-                if str(include_path) in self.processed_stories:
-                    continue
-                    
-                self.processed_stories.add(str(include_path))
-                included_story = self._load_story(str(include_path))
-                all_events.extend(self._resolve_includes(included_story, include_path.parent))
-        
-        return all_events
-    
-    def _generate_events(self, story: StoryConfig, events: List[EventSpec]) -> Generator[Event, None, None]:
-        """Generate events from event specifications."""
-        # Priority queue to maintain chronological order
-        event_queue = []
-        
-        for event_spec in events:
-            # Handle repeated events
-            repeat_count = event_spec.repeat or 1
-            for i in range(repeat_count):
-                offset = event_spec.offset_days + (i * (1 if event_spec.repeat else 0))
-                timestamp = story.start_date + timedelta(days=offset)
-                
-                # Resolve dynamic data fields
-                data = self.rule_resolver.resolve_data(event_spec.data)
-                
-                # Validate against schema
-                validated_data = self.registry.validate_data(
-                    event_spec.source,
-                    event_spec.event,
-                    data
-                )
-                
-                # Create event and add to queue
-                event = Event(
-                    source=event_spec.source,
-                    event=event_spec.event,
-                    org_id=story.org_id,
-                    timestamp=timestamp.isoformat(),
-                    data=validated_data
+        self.validation = validation
+        self.validate_first = validate_first
+        # Events validated so far in the current run, per (source, event)
+        self._validated: Dict[Tuple[str, str], int] = {}
+        self.seed = seed
+        self.workers = workers
+        self.shard_size = shard_size
+        self.text_pool = text_pool
+        self.story_cache = story_cache if story_cache is not None else get_story_cache()
+        self.profiler = profiler
+        self.include_graph = IncludeGraph(profiler=profiler)
+        if vectorize:
+            numpy()
+        self.vectorize = vectorize
+        self.autofill = autofill
+    
+    def compile_story(self, path: str) -> CompiledStory:
+        """
+        Load a story, resolve its includes and parse every spec's rules.
+        
+        Results come from the story cache while neither the story nor any of
+        its transitive includes has changed.
+        """
+        compiled = self.story_cache.get(path)
+        if compiled is not None:
+            return compiled
+        
+        resolved = self.include_graph.resolve(path)
+        resolver = RuleResolver()
+        start = time.perf_counter()
+        plans = [resolver.plan_data(event_spec.data) for event_spec in resolved.events]
+        if self.profiler is not None:
+            self.profiler.record("rules.parse", time.perf_counter() - start, calls=len(plans))
+        compiled = CompiledStory(resolved.story, resolved.events, plans, resolved.files)
+        self.story_cache.put(path, compiled)
+        return compiled
+    
+    def compile_stories(self, paths: Iterable[str]) -> List[CompiledStory]:
+        """Compile several stories, parsing includes they share only once."""
+        return [self.compile_story(path) for path in paths]
+    
+    def _generate_events(
+        self,
+        story: StoryConfig,
+        events: List[EventSpec],
+        plans: List[DataPlan],
+        window_start: Optional[datetime] = None,
+        window_end: Optional[datetime] = None,
+        columnar: bool = False
+    ) -> Generator[Any, None, None]:
+        """
+        Generate events from event specifications.
+        
+        Each spec yields its repetitions in timestamp order, so the specs are
+        merged lazily instead of expanding the whole story up front. Memory is
+        bounded by the number of specs and events are yielded immediately.
+        With `columnar`, ColumnBatches are yielded instead of events.
+        """
+        seed = self.seed if self.seed is not None else random_seed()
+        window = (window_start, window_end)
+        self._validated = {}
+        if self.autofill:
+            plans = [
+                self._fill_plan(event_spec.source, event_spec.event, plan)
+                for event_spec, plan in zip(events, plans)
+            ]
+        if self.workers == 1:
+            yield from self._merge_specs(story, events, plans, seed, window, None, columnar)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            shards = _ShardWindow(executor, self.workers)
+            yield from self._merge_specs(story, events, plans, seed, window, shards, columnar)
+    
+    def _fill_plan(self, source: str, event: str, plan: DataPlan) -> DataPlan:
+        """Add generated values for the required schema fields a spec leaves out."""
+        if not self.registry.has_schema(source, event):
+            return plan
+        return fill_missing(plan, self.registry.get_fill_plan(source, event, plan.template))
+    
+    def _merge_specs(
+        self,
+        story: StoryConfig,
+        events: List[EventSpec],
+        plans: List[DataPlan],
+        seed: int,
+        window: Tuple[Optional[datetime], Optional[datetime]],
+        shards: Optional["_ShardWindow"],
+        columnar: bool = False
+    ) -> Generator[Any, None, None]:
+        """
+        Merge the shard streams of every (tenant, spec) back into timestamp order.
+        
+        Column batches are merged by their first timestamp. With worker
+        shards, a stream's next shard only has to be generated once its
+        first timestamp is the earliest in the merge, so priming the merge
+        does not wait for any shard.
+        """
+        text_pool = self.text_pool
+        if story.tenants is not None and text_pool is None:
+            # A Faker per tenant shard would cost more than the events themselves
+            text_pool = get_text_pool()
+        fill = self._fill_plan if self.autofill else None
+        follow_ups = [
+            plan_follow_ups(event_spec.follow_ups, event_spec.source, plan.template, fill)
+            for event_spec, plan in zip(events, plans)
+        ]
+        spec_streams = [
+            (event_spec, self._generate_spec_shards(
+                story, tenant, spec_index, event_spec, plan, follow_ups[spec_index],
+                text_pool, window, shards, columnar
+            ))
+            for tenant in expand_tenants(story, seed, text_pool)
+            for spec_index, (event_spec, plan) in enumerate(zip(events, plans))
+        ]
+        key = _first_timestamp if columnar else attrgetter("timestamp")
+        merge = heapq.merge if shards is None else _merge_shards
+        if self.profiler is None:
+            yield from merge(*(stream for _, stream in spec_streams), key=key)
+            return
+        
+        # Time every step of the merge, minus the time spent producing events
+        merged = merge(
+            *(
+                self.profiler.iterate("generate", stream, (event_spec.source, event_spec.event))
+                for event_spec, stream in spec_streams
+            ),
+            key=key
+        )
+        generate = self.profiler.stage("generate")
+        while True:
+            start = time.perf_counter()
+            generated = generate.seconds
+            event = next(merged, None)
+            if event is None:
+                return
+            self.profiler.record("heap", time.perf_counter() - start - (generate.seconds - generated))
+            yield event
+    
+    def _generate_spec_shards(
+        self,
+        story: StoryConfig,
+        tenant: Tenant,
+        spec_index: int,
+        event_spec: EventSpec,
+        plan: DataPlan,
+        follow_ups: List[FollowUpPlan],
+        text_pool: Optional[TextPool],
+        window: Tuple[Optional[datetime], Optional[datetime]],
+        shards: Optional["_ShardWindow"],
+        columnar: bool = False
+    ) -> Generator[Any, None, None]:
+        """
+        Expand a spec for one tenant shard by shard, in order.
+        
+        Timestamps come from the spec's arrival process, drawn lazily from a
+        timing substream of the tenant's seed, and are cut into shards of
+        `shard_size`. Every shard draws its data from its own RNG substream,
+        keyed by the tenant's seed and its (spec, shard) index, so shards can
+        run in any process and in any order. In-process shards are generated
+        lazily; worker shards are submitted through the run's shard window,
+        which keeps at most `workers` of them in flight across all streams,
+        and each is preceded by a `_Shard` marker for `_merge_shards`.
+        
+        With a window, shards before it are skipped without generating any
+        data. Only the first overlapping shard replays the data draws of its
+        repetitions before the window, so values match a full run.
+        """
+        if follow_ups:
+            yield from self._with_follow_ups(
+                story, tenant, spec_index, event_spec, plan, follow_ups, text_pool, window, shards, columnar
+            )
+            return
+        # Stateful rules carry values from one repetition to the next, so
+        # such specs are expanded as a single shard
+        shard_size = sys.maxsize if is_stateful(plan) else self.shard_size
+        window_start, window_end = window
+        uniform = uniform_times(event_spec, story.start_date, tenant.activity, window_start, window_end)
+        if uniform is not None:
+            groups = self._range_shards(uniform, shard_size)
+        else:
+            # Other arrival processes depend on random draws, so the spec is
+            # walked from its start
+            times = enumerate(
+                spec_times(event_spec, story.start_date, substream(tenant.seed, spec_index, "timing"), tenant.activity)
+            )
+            if window_start is not None:
+                times = dropwhile(lambda item: item[1] < window_start, times)
+            if window_end is not None:
+                times = takewhile(lambda item: item[1] < window_end, times)
+            groups = self._shards(times, shard_size)
+        
+        if shards is None:
+            generate = self._generate_spec_batches if columnar else self._generate_spec_events
+            for shard_index, skip, _, timestamps in groups:
+                yield from generate(
+                    tenant.org_id, event_spec, plan, timestamps,
+                    random.Random(derive_seed(tenant.seed, spec_index, shard_index)),
+                    tenant.params, text_pool, skip
                 )
-                
-                heapq.heappush(event_queue, event)
+            return
+        
+        def task(shard_index: int, skip: int, timestamps: Iterable[datetime]) -> Tuple[Any, ...]:
+            if not isinstance(timestamps, UniformTimes):
+                timestamps = list(timestamps)
+            return (
+                tenant.org_id,
+                event_spec,
+                plan,
+                derive_seed(tenant.seed, spec_index, shard_index),
+                skip,
+                timestamps,
+                tenant.params,
+                self.validation,
+                self._shard_validations(event_spec, timestamps),
+                text_pool,
+                self.profiler is not None,
+                self.vectorize,
+                columnar
+            )
+        
+        for shard in shards.open(groups, task, None if columnar else datetime.isoformat):
+            yield shard
+            items, stats = shards.result(shard)
+            if stats is not None:
+                self.profiler.merge(stats)
+            yield from items
+    
+    def _with_follow_ups(
+        self,
+        story: StoryConfig,
+        tenant: Tenant,
+        spec_index: int,
+        event_spec: EventSpec,
+        plan: DataPlan,
+        follow_ups: List[FollowUpPlan],
+        text_pool: Optional[TextPool],
+        window: Tuple[Optional[datetime], Optional[datetime]],
+        shards: Optional["_ShardWindow"],
+        columnar: bool = False
+    ) -> Generator[Event, None, None]:
+        """
+        Expand a spec with follow-ups, scheduling them as its events are emitted.
+        
+        Follow-ups draw from a substream of their own, in the order parents
+        are emitted. Parents before a window may still have follow-ups inside
+        it, so the spec is expanded from its start and the window is applied
+        to what the scheduler yields.
+        """
+        if columnar:
+            raise ValueError(f"Column batches do not support follow-ups ({event_spec.source}.{event_spec.event})")
+        window_start, window_end = window
+        parents = self._generate_spec_shards(
+            story, tenant, spec_index, event_spec, plan, [], text_pool, (None, window_end), shards
+        )
+        if shards is not None:
+            # The scheduler needs every parent, so shards are waited for in turn
+            parents = (parent for parent in parents if type(parent) is not _Shard)
+        resolver = RuleResolver(
+            rng=substream(tenant.seed, spec_index, "follow_ups"), pool=text_pool, params=tenant.params
+        )
+        scheduler = FollowUpScheduler(follow_ups, resolver, self._get_validator)
+        yield from scheduler.run(parents, window_start, window_end)
+    
+    def _shards(
+        self,
+        times: Iterator[Tuple[int, datetime]],
+        shard_size: int
+    ) -> Iterator[Tuple[int, int, datetime, Iterator[datetime]]]:
+        """
+        Group indexed timestamps into (shard index, skip, first timestamp, timestamps).
+        
+        `skip` counts the shard's repetitions before its first timestamp,
+        which is only non-zero when a window starts inside the shard.
+        Timestamps are lazy and must be consumed in turn.
+        """
+        for shard_index, group in groupby(times, key=lambda item: item[0] // shard_size):
+            first_index, first_time = next(group)
+            yield (
+                shard_index,
+                first_index - shard_index * shard_size,
+                first_time,
+                chain((first_time,), (timestamp for _, timestamp in group))
+            )
+    
+    def _range_shards(
+        self,
+        times: UniformTimes,
+        shard_size: int
+    ) -> Iterator[Tuple[int, int, datetime, UniformTimes]]:
+        """Cut a range of timestamps into shards, like `_shards`, without walking it."""
+        index = times.first
+        while index < times.stop:
+            shard_index = index // shard_size
+            stop = min(times.stop, (shard_index + 1) * shard_size)
+            timestamps = times[index - times.first:stop - times.first]
+            yield shard_index, index - shard_index * shard_size, timestamps[0], timestamps
+            index = stop
+    
+    def _generate_spec_events(
+        self,
+        org_id: str,
+        event_spec: EventSpec,
+        plan: DataPlan,
+        timestamps: Iterable[datetime],
+        rng: random.Random,
+        params: Optional[Dict[str, Any]] = None,
+        text_pool: Optional[TextPool] = None,
+        skip: int = 0
+    ) -> Generator[Event, None, None]:
+        """
+        Generate a single spec's repetitions at the given sorted timestamps.
+        
+        The data of `skip` earlier repetitions is drawn and discarded first,
+        to bring the RNG to the state a full shard would have.
+        """
+        profiler = self._spec_profiler(event_spec)
+        validate = self._spec_validator(event_spec, profiler)
+        pool = text_pool or self.text_pool
+        source = sys.intern(event_spec.source)
+        event_name = sys.intern(event_spec.event)
+        
+        if self.vectorize and is_vectorizable(plan, pool):
+            batches = self._vector_batches(org_id, event_spec, plan, timestamps, rng, params, pool, skip, profiler)
+            for batch in batches:
+                # Rows are zipped from whole columns, constants repeated, so
+                # the only Python code run per event is Event.__init__
+                times = batch.timestamps
+                isoformats = times.isoformats() if isinstance(times, UniformTimes) else [
+                    timestamp.isoformat() for timestamp in times
+                ]
+                template = batch.template
+                if template:
+                    names = list(template)
+                    values = [
+                        batch.columns[name].tolist() if name in batch.columns else repeat(value)
+                        for name, value in template.items()
+                    ]
+                    rows = map(dict, map(zip, repeat(names), zip(*values)))
+                else:
+                    rows = (template.copy() for _ in isoformats)
+                if validate is not _trust:
+                    rows = map(validate, rows)
+                yield from map(Event, repeat(source), repeat(event_name), repeat(org_id), isoformats, rows)
+            return
+        
+        generate_data = self._compile_spec(plan, rng, params, pool, profiler)
+        for _ in range(skip):
+            generate_data()
+        
+        for timestamp in timestamps:
+            # Resolve dynamic data fields
+            data = generate_data()
+            
+            # Validate against schema
+            validated_data = validate(data)
+            
+            yield Event(
+                source=source,
+                event=event_name,
+                org_id=org_id,
+                timestamp=timestamp.isoformat(),
+                data=validated_data
+            )
+    
+    def _generate_spec_batches(
+        self,
+        org_id: str,
+        event_spec: EventSpec,
+        plan: DataPlan,
+        timestamps: Iterable[datetime],
+        rng: random.Random,
+        params: Optional[Dict[str, Any]] = None,
+        text_pool: Optional[TextPool] = None,
+        skip: int = 0
+    ) -> Generator[ColumnBatch, None, None]:
+        """
+        Generate the same repetitions as `_generate_spec_events`, as column batches.
+        
+        Vectorized specs never build dicts unless validation needs them;
+        others are resolved row by row and transposed. Validation only checks
+        the data, which is left as generated.
+        """
+        profiler = self._spec_profiler(event_spec)
+        validate = self._spec_validator(event_spec, profiler)
+        pool = text_pool or self.text_pool
+        if self.vectorize and is_vectorizable(plan, pool):
+            batches = self._vector_batches(org_id, event_spec, plan, timestamps, rng, params, pool, skip, profiler)
+        else:
+            batches = self._row_batches(org_id, event_spec, plan, timestamps, rng, params, pool, skip, profiler)
+        if validate is _trust:
+            yield from batches
+            return
+        
+        # In "first-n" mode only the rows that get validated are assembled
+        key = (event_spec.source, event_spec.event)
+        for batch in batches:
+            if self.validation == "full":
+                for data in batch.rows():
+                    validate(data)
+            else:
+                remaining = self.validate_first - self._validated.get(key, 0)
+                if remaining > 0:
+                    for data in islice(batch.rows(), remaining):
+                        validate(data)
+            yield batch
+    
+    def _vector_batches(
+        self,
+        org_id: str,
+        event_spec: EventSpec,
+        plan: DataPlan,
+        timestamps: Iterable[datetime],
+        rng: random.Random,
+        params: Optional[Dict[str, Any]],
+        pool: Optional[TextPool],
+        skip: int,
+        profiler: Optional[BoundProfiler]
+    ) -> Generator[ColumnBatch, None, None]:
+        """
+        Draw a vectorizable spec's repetitions as NumPy columns.
+        
+        Repetitions are drawn in blocks of `VECTOR_BLOCK`, each from its own
+        generator seeded by the shard RNG and the block's index, and always
+        in full, so `skip` only selects where to start.
+        """
+        np = numpy()
+        start = time.perf_counter()
+        template, draw = compile_columns(plan, params, pool)
+        if profiler is not None:
+            profiler.record("rules.compile", time.perf_counter() - start)
+            draw = profiler.wrap("rules.vector", draw)
+        source = sys.intern(event_spec.source)
+        event_name = sys.intern(event_spec.event)
+        
+        base_seed = rng.getrandbits(63)
+        block, offset = divmod(skip, VECTOR_BLOCK)
+        if isinstance(timestamps, UniformTimes):
+            # Ranges are sliced, never walked
+            remaining = timestamps
+            
+            def take(size: int) -> Sequence[datetime]:
+                nonlocal remaining
+                chunk, remaining = remaining[:size], remaining[size:]
+                return chunk
+        else:
+            timestamps = iter(timestamps)
+            take = lambda size: list(islice(timestamps, size))
+        while True:
+            chunk = take(VECTOR_BLOCK - offset)
+            if not chunk:
+                return
+            columns = draw(np.random.default_rng((base_seed, block)), VECTOR_BLOCK)
+            end = offset + len(chunk)
+            yield ColumnBatch(source, event_name, org_id, chunk, template, {
+                key: column[offset:end] for key, column in columns.items()
+            })
+            block += 1
+            offset = 0
+    
+    def _row_batches(
+        self,
+        org_id: str,
+        event_spec: EventSpec,
+        plan: DataPlan,
+        timestamps: Iterable[datetime],
+        rng: random.Random,
+        params: Optional[Dict[str, Any]],
+        pool: Optional[TextPool],
+        skip: int,
+        profiler: Optional[BoundProfiler]
+    ) -> Generator[ColumnBatch, None, None]:
+        """Resolve a spec's repetitions row by row and group them into column batches."""
+        generate_data = self._compile_spec(plan, rng, params, pool, profiler)
+        for _ in range(skip):
+            generate_data()
+        source = sys.intern(event_spec.source)
+        event_name = sys.intern(event_spec.event)
         
-        # Yield events in chronological order
-        while event_queue:
-            yield heapq.heappop(event_queue)
+        timestamps = iter(timestamps)
+        while True:
+            chunk = list(islice(timestamps, VECTOR_BLOCK))
+            if not chunk:
+                return
+            rows = [generate_data() for _ in chunk]
+            yield ColumnBatch.from_rows(source, event_name, org_id, chunk, rows)
     
-    def stream_story(self, path: str) -> Generator[Event, None, None]:
-        """Stream events from a story file."""
-        story_path = Path(path)
-        story = self._load_story(str(story_path))
+    def _spec_profiler(self, event_spec: EventSpec) -> Optional[BoundProfiler]:
+        """Get a view of the profiler recording under the spec's (source, event)."""
+        if self.profiler is None:
+            return None
+        return self.profiler.bind((event_spec.source, event_spec.event))
+    
+    def _spec_validator(self, event_spec: EventSpec, profiler: Optional[BoundProfiler]) -> Validator:
+        """Look up a spec's validator once for all its repetitions."""
+        validate = self._get_validator(event_spec.source, event_spec.event)
+        if profiler is not None and validate is not _trust:
+            validate = profiler.wrap("validate", validate)
+        return validate
+    
+    def _compile_spec(
+        self,
+        plan: DataPlan,
+        rng: random.Random,
+        params: Optional[Dict[str, Any]],
+        pool: Optional[TextPool],
+        profiler: Optional[BoundProfiler]
+    ) -> Callable[[], Dict[str, Any]]:
+        """Bind a spec's parsed rules to a shard RNG."""
+        resolver = RuleResolver(rng=rng, pool=pool, params=params, profiler=profiler)
+        start = time.perf_counter()
+        generate_data = resolver.compile_plan(plan)
+        if profiler is not None:
+            profiler.record("rules.compile", time.perf_counter() - start)
+        return generate_data
+    
+    def _get_validator(self, source: str, event: str) -> Validator:
+        """Get the validator for an event type according to the validation mode."""
+        if self.validation == "off":
+            return _trust
+        
+        validator = self.registry.get_validator(source, event)
+        if self.validation == "full":
+            return validator
+        
+        coerce = self.registry.get_coercer(source, event)
+        key = (source, event)
+        counts = self._validated
         
-        # Reset processed stories for this stream
-        self.processed_stories = {str(story_path.resolve())}
+        def validate_first(data: dict) -> dict:
+            seen = counts.get(key, 0)
+            if seen >= self.validate_first:
+                return coerce(data)
+            counts[key] = seen + 1
+            return validator(data)
         
-        # Resolve includes and get all events
-        all_events = self._resolve_includes(story, story_path.parent)
+        return validate_first
+    
+    def _shard_validations(self, event_spec: EventSpec, timestamps: List[datetime]) -> int:
+        """Take a worker shard's share of the run's "first-n" validations."""
+        if self.validation != "first-n":
+            return self.validate_first
+        key = (event_spec.source, event_spec.event)
+        seen = self._validated.get(key, 0)
+        taken = max(0, min(len(timestamps), self.validate_first - seen))
+        self._validated[key] = seen + taken
+        return taken
+    
+    def stream_story(
+        self,
+        path: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Generator[Event, None, None]:
+        """
+        Stream events from a story file.
+        
+        With `start` and/or `end`, only events in [start, end) are generated,
+        with the same values a full run with the same seed gives them. Data
+        before the window is not generated, except for replaying at most one
+        shard's worth of rule draws per spec.
+        """
+        if start is not None and end is not None and end < start:
+            raise ValueError("end must not be before start")
+        compiled = self.compile_story(path)
         
         # Generate and yield events
-        yield from self._generate_events(story, all_events)
+        yield from self._generate_events(
+            compiled.story, compiled.events, compiled.plans, start, end
+        )
+    
+    def stream_columns(
+        self,
+        path: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Generator[ColumnBatch, None, None]:
+        """
+        Stream a story as column batches, e.g. for `ColumnarSink.write_batch`.
+        
+        Each batch holds up to `VECTOR_BLOCK` consecutive repetitions of one
+        spec for one org, with the same values `stream_story` gives them.
+        Batches come in order of their first timestamp, but rows of different
+        batches are not interleaved. Windows work as in `stream_story`.
+        """
+        if start is not None and end is not None and end < start:
+            raise ValueError("end must not be before start")
+        compiled = self.compile_story(path)
+        yield from self._generate_events(
+            compiled.story, compiled.events, compiled.plans, start, end, columnar=True
+        )
+    
+    def astream_story(self, path: str, **options: Any) -> AsyncIterator[Event]:
+        """
+        Stream events from a story file as an async iterator.
+        
+        Generation runs in a background thread; see `sim.aio.astream` for the
+        "flood"/"replay" modes and backpressure options.
+        """
+        from .aio import astream
+        return astream(self.stream_story(path), **options)
+
+def _trust(data: dict) -> dict:
+    """Pass event data through without validation."""
+    return data
+
+def _first_timestamp(batch: ColumnBatch) -> datetime:
+    return batch.timestamps[0]
+
+class _Shard:
+    """A worker shard of one stream, standing in for its events in the merge until it is due."""
+    __slots__ = ("stream", "key", "group", "future")
+
+    def __init__(self, stream: "_ShardStream", key: Any, group: Tuple[int, int, Iterator[datetime]]):
+        self.stream = stream
+        self.key = key
+        # (shard index, skip, lazy timestamps) until the shard is submitted
+        self.group = group
+        self.future = None
+
+class _ShardStream:
+    """
+    The worker shards of one (tenant, spec), registered with the window one ahead.
+    
+    A shard's timestamps are only materialized, and its task built, when it
+    is submitted, so registering it costs nothing but its first timestamp.
+    """
+
+    def __init__(
+        self,
+        window: "_ShardWindow",
+        groups: Iterator[Tuple[int, int, datetime, Iterator[datetime]]],
+        task: Callable[[int, int, Iterator[datetime]], Tuple[Any, ...]],
+        key: Optional[Callable[[datetime], Any]]
+    ):
+        self.window = window
+        self.groups = groups
+        self.task = task
+        self.key = key
+        self.queued: "deque[_Shard]" = deque()
+    
+    def add_next(self) -> bool:
+        """Register the stream's next shard with the window, if it has one."""
+        group = next(self.groups, None)
+        if group is None:
+            return False
+        shard_index, skip, first_time, timestamps = group
+        key = first_time if self.key is None else self.key(first_time)
+        shard = _Shard(self, key, (shard_index, skip, timestamps))
+        self.queued.append(shard)
+        self.window.add(shard)
+        return True
+    
+    def __iter__(self) -> Iterator[_Shard]:
+        while self.queued or self.add_next():
+            yield self.queued.popleft()
 
-def stream_story(path: str) -> Generator[Event, None, None]:
-    """Convenience function to stream events from a story file."""
-    engine = SimulationEngine()
-    yield from engine.stream_story(path) 
\ No newline at end of file
+class _ShardWindow:
+    """
+    Submits the worker shards of every stream of a run, at most `size` at a time.
+    
+    Shards are submitted in order of their first timestamp, which is the
+    order the merge needs them in, and count against the window until their
+    result has been taken. Submitting a shard registers the next one of its
+    stream, so a single stream can still keep every worker busy. A shard
+    needed before its turn is submitted right away.
+    """
+
+    def __init__(self, executor: "Executor", size: int):
+        self.executor = executor
+        self.size = size
+        self.running = 0
+        self._waiting: List[Tuple[Any, int, _Shard]] = []
+        self._sequence = count()
+    
+    def open(
+        self,
+        groups: Iterator[Tuple[int, int, datetime, Iterator[datetime]]],
+        task: Callable[[int, int, Iterator[datetime]], Tuple[Any, ...]],
+        key: Optional[Callable[[datetime], Any]] = None
+    ) -> _ShardStream:
+        """
+        Start a stream of shards.
+        
+        Args:
+            groups: The stream's shards, as yielded by `SimulationEngine._shards`
+            task: Builds the `_generate_shard` arguments of a shard
+            key: Turns a shard's first timestamp into the merge key of its
+                first item; the timestamp itself by default
+        """
+        return _ShardStream(self, groups, task, key)
+    
+    def add(self, shard: _Shard) -> None:
+        heapq.heappush(self._waiting, (shard.key, next(self._sequence), shard))
+        self._fill()
+    
+    def result(self, shard: _Shard) -> Tuple[List[Any], Optional[Profiler]]:
+        """Wait for a shard's items and stats, submitting it first if it is not yet."""
+        if shard.future is None:
+            self._submit(shard)
+        result = shard.future.result()
+        self.running -= 1
+        self._fill()
+        return result
+    
+    def _submit(self, shard: _Shard) -> None:
+        task = shard.stream.task(*shard.group)
+        shard.group = None
+        shard.future = self.executor.submit(_generate_shard, *task)
+        self.running += 1
+        # The shard's timestamps are consumed, so the next one can be read
+        shard.stream.add_next()
+    
+    def _fill(self) -> None:
+        while self.running < self.size and self._waiting:
+            shard = heapq.heappop(self._waiting)[2]
+            if shard.future is None:
+                self._submit(shard)
+
+def _merge_shards(*streams: Iterator[Any], key: Callable[[Any], Any]) -> Iterator[Any]:
+    """
+    `heapq.merge` for streams that interleave `_Shard` markers with their items.
+    
+    A marker sorts by its shard's first timestamp and is dropped when it
+    comes up, which is when its stream is advanced into the shard.
+    """
+    def item_key(item: Any) -> Any:
+        return item.key if type(item) is _Shard else key(item)
+    
+    heap = []
+    for order, stream in enumerate(streams):
+        item = next(stream, _END)
+        if item is not _END:
+            heap.append((item_key(item), order, item, stream))
+    heapq.heapify(heap)
+    while heap:
+        _, order, item, stream = heap[0]
+        if type(item) is not _Shard:
+            yield item
+        item = next(stream, _END)
+        if item is _END:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (item_key(item), order, item, stream))
+
+_END = object()
+
+# Per-process engines used to expand shards, keyed by engine settings
+_SHARD_ENGINES: Dict[Tuple[str, Optional[TextPool], bool], SimulationEngine] = {}
+
+def _generate_shard(
+    org_id: str,
+    event_spec: EventSpec,
+    plan: DataPlan,
+    seed: int,
+    skip: int,
+    timestamps: Sequence[datetime],
+    params: Dict[str, Any],
+    validation: str,
+    validate_first: int,
+    text_pool: Optional[TextPool],
+    profile: bool,
+    vectorize: bool = False,
+    columnar: bool = False
+) -> Tuple[List[Any], Optional[Profiler]]:
+    """Expand one shard of a spec in a worker process, with its stage stats if profiling."""
+    key = (validation, text_pool, vectorize)
+    if key not in _SHARD_ENGINES:
+        _SHARD_ENGINES[key] = SimulationEngine(validation=validation, text_pool=text_pool, vectorize=vectorize)
+    engine = _SHARD_ENGINES[key]
+    engine.profiler = Profiler() if profile else None
+    # In "first-n" mode, validate_first is this shard's share of the run's validations
+    engine.validate_first = validate_first
+    engine._validated = {}
+    generate = engine._generate_spec_batches if columnar else engine._generate_spec_events
+    items = list(generate(org_id, event_spec, plan, timestamps, random.Random(seed), params, skip=skip))
+    return items, engine.profiler
+
+def stream_story(
+    path: str,
+    validation: str = "full",
+    validate_first: int = DEFAULT_VALIDATE_FIRST,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    text_pool: Optional[TextPool] = None,
+    profiler: Optional[Profiler] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    vectorize: bool = False,
+    autofill: bool = False
+) -> Generator[Event, None, None]:
+    """Convenience function to stream events from a story file, optionally windowed."""
+    engine = SimulationEngine(
+        validation=validation,
+        validate_first=validate_first,
+        seed=seed,
+        workers=workers,
+        text_pool=text_pool,
+        profiler=profiler,
+        vectorize=vectorize,
+        autofill=autofill
+    )
+    yield from engine.stream_story(path, start, end)
+
+def stream_columns(
+    path: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    **options: Any
+) -> Generator[ColumnBatch, None, None]:
+    """
+    Convenience function to stream a story as column batches.
+    
+    Options are passed to `SimulationEngine`, e.g.
+    `write_columnar(stream_columns(path, vectorize=True), "out.parquet")`.
+    """
+    yield from SimulationEngine(**options).stream_columns(path, start, end) 
\ No newline at end of file
@@ -1,21 +1,52 @@
-from faker import Faker
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import random
 import string
+from weakref import WeakKeyDictionary
 
-_FAKER_INSTANCE: Optional[Faker] = None
+# Faker takes longer to import than the rest of the simulator, so it is only
+# imported once a rule actually needs it
+if TYPE_CHECKING:
+    from faker import Faker
+    from .text_pools import TextPool
 
-def get_faker() -> Faker:
+_FAKER_INSTANCE: Optional["Faker"] = None
+
+# Fakers drawing from callers' RNGs, so helpers given an RNG but no Faker
+# stay deterministic
+_RNG_FAKERS: "WeakKeyDictionary[random.Random, Faker]" = WeakKeyDictionary()
+
+def get_faker() -> "Faker":
     """Get or create a singleton Faker instance."""
     global _FAKER_INSTANCE
     if _FAKER_INSTANCE is None:
+        from faker import Faker
         _FAKER_INSTANCE = Faker()
     return _FAKER_INSTANCE
 
-def generate_id(prefix: str = "", length: int = 8) -> str:
+def make_faker(rng: Optional[random.Random] = None) -> "Faker":
+    """Create a Faker instance that draws from the given RNG instead of its own."""
+    from faker import Faker
+    faker = Faker()
+    if rng is not None:
+        faker.random = rng
+    return faker
+
+def _faker_for(rng: random.Random, faker: Optional["Faker"]) -> "Faker":
+    """Use `faker`, else a cached Faker drawing from `rng`."""
+    if faker is not None:
+        return faker
+    derived = _RNG_FAKERS.get(rng)
+    if derived is None:
+        derived = _RNG_FAKERS[rng] = make_faker(rng)
+    return derived
+
+# The helpers below take the RNG to draw from first; there is no fallback to
+# the global `random` module, so seeded runs stay reproducible
+
+def generate_id(rng: random.Random, prefix: str = "", length: int = 8) -> str:
     """Generate a random ID with an optional prefix."""
     chars = string.ascii_lowercase + string.digits
-    random_part = ''.join(random.choices(chars, k=length))
+    random_part = ''.join(rng.choices(chars, k=length))
     return f"{prefix}_{random_part}" if prefix else random_part
 
 def generate_timestamp(base_date, offset_days: int = 0, offset_hours: int = 0) -> str:
@@ -27,43 +58,65 @@ def generate_timestamp(base_date, offset_days: int = 0, offset_hours: int = 0) -
         date = date.replace(hour=date.hour + offset_hours)
     return date.isoformat()
 
-def generate_company_name() -> str:
-    """Generate a realistic company name."""
-    faker = get_faker()
+def generate_company_name(
+    rng: random.Random,
+    faker: Optional["Faker"] = None,
+    pool: Optional["TextPool"] = None
+) -> str:
+    """Generate a realistic company name, sampled from `pool` when given."""
+    if pool is not None:
+        return rng.choice(pool.get("company"))
+    faker = _faker_for(rng, faker)
     patterns = [
         lambda: f"{faker.word().capitalize()}Stack",
         lambda: f"{faker.word().capitalize()}Labs",
         lambda: f"{faker.word().capitalize()}AI",
         lambda: f"{faker.word().capitalize()}{faker.word().capitalize()}",
     ]
-    return random.choice(patterns)()
+    return rng.choice(patterns)()
 
-def generate_user_name() -> str:
-    """Generate a realistic username."""
-    faker = get_faker()
-    return faker.user_name()
+def generate_user_name(
+    rng: random.Random,
+    faker: Optional["Faker"] = None,
+    pool: Optional["TextPool"] = None
+) -> str:
+    """Generate a realistic username, sampled from `pool` when given."""
+    if pool is not None:
+        return rng.choice(pool.get("user_name"))
+    return _faker_for(rng, faker).user_name()
 
-def generate_email(name: Optional[str] = None) -> str:
-    """Generate a realistic email address."""
-    faker = get_faker()
+def generate_email(
+    rng: random.Random,
+    faker: Optional["Faker"] = None,
+    pool: Optional["TextPool"] = None,
+    name: Optional[str] = None
+) -> str:
+    """Generate a realistic email address, sampled from `pool` when given and no `name` is."""
     if name is None:
-        name = generate_user_name()
-    domain = random.choice(["gmail.com", "yahoo.com", "hotmail.com", "company.com"])
+        if pool is not None:
+            return rng.choice(pool.get("email"))
+        name = generate_user_name(rng, faker)
+    domain = rng.choice(["gmail.com", "yahoo.com", "hotmail.com", "company.com"])
     return f"{name}@{domain}"
 
-def generate_url() -> str:
-    """Generate a realistic URL."""
-    faker = get_faker()
-    return faker.url()
+def generate_url(
+    rng: random.Random,
+    faker: Optional["Faker"] = None,
+    pool: Optional["TextPool"] = None
+) -> str:
+    """Generate a realistic URL, sampled from `pool` when given."""
+    if pool is not None:
+        return rng.choice(pool.get("url"))
+    return _faker_for(rng, faker).url()
 
-def generate_version() -> str:
+def generate_version(rng: random.Random) -> str:
     """Generate a semantic version number."""
-    major = random.randint(0, 3)
-    minor = random.randint(0, 9)
-    patch = random.randint(0, 99)
+    major = rng.randint(0, 3)
+    minor = rng.randint(0, 9)
+    patch = rng.randint(0, 99)
     return f"{major}.{minor}.{patch}"
 
-def generate_error_message() -> str:
+def generate_error_message(rng: random.Random) -> str:
     """Generate a realistic error message."""
     templates = [
         "Connection refused",
@@ -75,4 +128,4 @@ def generate_error_message() -> str:
         "Service unavailable",
         "Invalid request format",
     ]
-    return random.choice(templates)
+    return rng.choice(templates)
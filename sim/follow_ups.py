@@ -0,0 +1,151 @@
+import heapq
+import random
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .config import Event, FollowUpSpec
+from .registry import Validator
+from .rule_resolver import DataPlan, RuleResolver
+from .timing import delay_sampler
+
+class FollowUpPlan(NamedTuple):
+    """A follow-up spec with its source resolved and its data parsed."""
+    spec: FollowUpSpec
+    source: str
+    plan: DataPlan
+    children: List["FollowUpPlan"]
+
+def plan_follow_ups(
+    specs: List[FollowUpSpec],
+    parent_source: str,
+    parent_fields: Collection[str],
+    fill: Optional[Callable[[str, str, DataPlan], DataPlan]] = None
+) -> List[FollowUpPlan]:
+    """
+    Parse a tree of follow-up specs once per run.
+
+    `fill` optionally completes each parsed plan, e.g. with schema
+    auto-fill. Shared fields must be among `parent_fields`, the fields
+    of the parent's data.
+    """
+    resolver = RuleResolver()
+    plans = []
+    for spec in specs:
+        missing = [field for field in spec.share if field not in parent_fields]
+        if missing:
+            raise ValueError(f"Follow-up {spec.event} shares fields its parent does not have: {missing}")
+        source = spec.source or parent_source
+        plan = resolver.plan_data(spec.data)
+        if fill is not None:
+            plan = fill(source, spec.event, plan)
+        fields = set(plan.template).union(spec.share)
+        children = plan_follow_ups(spec.follow_ups, source, fields, fill)
+        plans.append(FollowUpPlan(spec, source, plan, children))
+    return plans
+
+class _CompiledFollowUp(NamedTuple):
+    source: str
+    event: str
+    probability: float
+    delay: Callable[[], timedelta]
+    share: List[str]
+    generate: Callable[[], Dict[str, Any]]
+    validate: Validator
+    children: List["_CompiledFollowUp"]
+
+class FollowUpScheduler:
+    """
+    Interleaves the follow-ups of a stream of parent events, in timestamp order.
+
+    Follow-ups are drawn when their parent is emitted, not up front: a
+    parent's direct follow-ups are pushed on a priority queue, and their own
+    follow-ups only once they are popped. Memory is bounded by the number
+    of pending follow-ups. All draws come from one RNG in emission order, so
+    output is reproducible, and a window only filters what is yielded.
+
+    Args:
+        plans: Follow-up plans of the parent spec
+        resolver: Resolver binding follow-up rules to the stream's RNG
+        get_validator: Returns the validator of a (source, event)
+    """
+
+    def __init__(
+        self,
+        plans: List[FollowUpPlan],
+        resolver: RuleResolver,
+        get_validator: Callable[[str, str], Validator]
+    ):
+        self.rng: random.Random = resolver.rng
+        self.follow_ups = [self._compile(plan, resolver, get_validator) for plan in plans]
+
+    def _compile(
+        self,
+        plan: FollowUpPlan,
+        resolver: RuleResolver,
+        get_validator: Callable[[str, str], Validator]
+    ) -> _CompiledFollowUp:
+        return _CompiledFollowUp(
+            plan.source,
+            plan.spec.event,
+            plan.spec.probability,
+            delay_sampler(plan.spec.delay, self.rng),
+            plan.spec.share,
+            resolver.compile_plan(plan.plan),
+            get_validator(plan.source, plan.spec.event),
+            [self._compile(child, resolver, get_validator) for child in plan.children]
+        )
+
+    def run(
+        self,
+        parents: Iterable[Event],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[Event]:
+        """
+        Yield parents and their follow-ups in timestamp order.
+
+        Parents must be in timestamp order. Only events in [start, end) are
+        yielded; parents before `start` still schedule their follow-ups.
+        """
+        queue: List[Tuple[str, int, datetime, Event, List[_CompiledFollowUp]]] = []
+        sequence = count()
+        rng = self.rng
+
+        def schedule(parent: Event, time: datetime, follow_ups: List[_CompiledFollowUp]) -> None:
+            for follow_up in follow_ups:
+                if follow_up.probability < 1.0 and rng.random() >= follow_up.probability:
+                    continue
+                follow_up_time = time + follow_up.delay()
+                data = follow_up.generate()
+                for field in follow_up.share:
+                    data[field] = parent.data[field]
+                event = Event(
+                    follow_up.source,
+                    follow_up.event,
+                    parent.org_id,
+                    follow_up_time.isoformat(),
+                    follow_up.validate(data)
+                )
+                if end is None or follow_up_time < end:
+                    heapq.heappush(
+                        queue, (event.timestamp, next(sequence), follow_up_time, event, follow_up.children)
+                    )
+
+        for parent in parents:
+            # Follow-ups due at the same time as the parent go first
+            while queue and queue[0][0] <= parent.timestamp:
+                _, _, time, event, children = heapq.heappop(queue)
+                schedule(event, time, children)
+                if start is None or time >= start:
+                    yield event
+            time = datetime.fromisoformat(parent.timestamp)
+            schedule(parent, time, self.follow_ups)
+            if start is None or time >= start:
+                yield parent
+
+        while queue:
+            _, _, time, event, children = heapq.heappop(queue)
+            schedule(event, time, children)
+            if start is None or time >= start:
+                yield event
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from autosourcesim.profiling import Profiler
+
+from .config import EventSpec, StoryConfig
+from .story_cache import content_hash, load_yaml
+
+def _parse_story(content: bytes) -> StoryConfig:
+    """Parse and validate the contents of a story file."""
+    data = load_yaml(content)
+    if isinstance(data['start_date'], str):
+        data['start_date'] = datetime.fromisoformat(data['start_date'])
+    return StoryConfig(**data)
+
+class IncludeCycleError(ValueError):
+    """Raised when a story includes itself, directly or through other stories."""
+
+    def __init__(self, chain: List[str]):
+        self.chain = chain
+        super().__init__("Include cycle: " + " -> ".join(chain))
+
+@dataclass(frozen=True)
+class StoryNode:
+    """A parsed story file and the resolved paths of the stories it includes."""
+    path: str
+    content_hash: str
+    story: StoryConfig
+    includes: Tuple[str, ...]
+
+@dataclass
+class ResolvedStory:
+    """A root story with the events of its whole include graph."""
+    story: StoryConfig
+    events: List[EventSpec]
+    # (resolved path, content hash) of the root and every story it reaches
+    files: List[Tuple[str, str]]
+
+class IncludeGraph:
+    """
+    Resolves story includes, parsing every file at most once.
+
+    Nodes are memoized by resolved path and reused for as long as the file's
+    content hash is unchanged, so a base story shared by many roots is
+    parsed once per graph no matter how many roots include it.
+
+    Events are collected depth-first in include order: a story's own events
+    come first, then those of each include. A story reachable along several
+    paths (a diamond) contributes its events once, at its first position in
+    that order. Cycles raise `IncludeCycleError`.
+
+    Args:
+        profiler: Optional profiler recording "yaml.load" for every parse and
+            "includes.resolve" for every root resolved (parses included)
+    """
+
+    def __init__(self, profiler: Optional[Profiler] = None):
+        self._nodes: Dict[str, StoryNode] = {}
+        self.profiler = profiler
+
+    def node(self, path: Union[str, Path]) -> StoryNode:
+        """Get the parsed node for a story file."""
+        path = Path(path).resolve()
+        key = str(path)
+        with open(path, 'rb') as f:
+            content = f.read()
+        file_hash = content_hash(content)
+
+        cached = self._nodes.get(key)
+        if cached is not None and cached.content_hash == file_hash:
+            return cached
+
+        if self.profiler is not None:
+            with self.profiler.timed("yaml.load"):
+                story = _parse_story(content)
+        else:
+            story = _parse_story(content)
+        includes = tuple(str((path.parent / include).resolve()) for include in story.includes or ())
+        node = StoryNode(key, file_hash, story, includes)
+        self._nodes[key] = node
+        return node
+
+    def resolve(self, path: Union[str, Path]) -> ResolvedStory:
+        """Resolve a root story and all of its transitive includes."""
+        if self.profiler is not None:
+            with self.profiler.timed("includes.resolve"):
+                return self._resolve(path)
+        return self._resolve(path)
+
+    def _resolve(self, path: Union[str, Path]) -> ResolvedStory:
+        root = self.node(path)
+        visited: Dict[str, StoryNode] = {}
+        events: List[EventSpec] = []
+        self._visit(root, [], visited, events)
+        return ResolvedStory(
+            root.story,
+            events,
+            [(node.path, node.content_hash) for node in visited.values()]
+        )
+
+    def resolve_many(self, paths: Iterable[Union[str, Path]]) -> List[ResolvedStory]:
+        """Resolve several root stories, sharing the nodes they have in common."""
+        return [self.resolve(path) for path in paths]
+
+    def clear(self) -> None:
+        """Forget every parsed node."""
+        self._nodes.clear()
+
+    def _visit(
+        self,
+        node: StoryNode,
+        chain: List[str],
+        visited: Dict[str, StoryNode],
+        events: List[EventSpec]
+    ) -> None:
+        visited[node.path] = node
+        events.extend(node.story.events)
+
+        chain.append(node.path)
+        for include in node.includes:
+            if include in chain:
+                raise IncludeCycleError(chain[chain.index(include):] + [include])
+            if include not in visited:
+                self._visit(self.node(include), chain, visited, events)
+        chain.pop()
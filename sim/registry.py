@@ -1,56 +1,328 @@
-from typing import Dict, Type, Tuple
-from pydantic import BaseModel
+from importlib import import_module
+from typing import Any, Callable, Collection, Dict, FrozenSet, Optional, Set, Type, Tuple, Union, get_args, get_origin
+from pydantic import BaseModel, PydanticUserError, TypeAdapter
+from pydantic.fields import FieldInfo
+from typing_extensions import Annotated, NotRequired, TypedDict
 
-from .schemas.common import (
-    AnalyticsEvent,
-    MetricsEvent,
-    AlertEvent,
-    TransactionEvent,
-    UserEvent
-)
+from .autofill import plan_schema
+from .rule_resolver import DataPlan
+
+try:
+    from types import UnionType
+except ImportError:  # Python < 3.10
+    UnionType = Union
+
+# Entry point group of schema plugins. Each entry point is named after the
+# source it provides schemas for and loads a module registering them with
+# `register_schema`, e.g. in pyproject.toml:
+#   [project.entry-points."autosource.schemas"]
+#   stripe = "my_package.stripe_schemas"
+ENTRY_POINT_GROUP = "autosource.schemas"
+
+# Built-in schemas: source -> (module, {event: schema class name}). A
+# source's module is only imported on the first lookup of that source
+BUILTIN_SCHEMAS: Dict[str, Tuple[str, Dict[str, str]]] = {
+    "analytics": ("sim.schemas.common", {
+        "page.view": "AnalyticsEvent",
+        "search.performed": "AnalyticsEvent",
+        "feature.usage": "AnalyticsEvent",
+        "user.signup": "UserEvent",
+    }),
+    "monitoring": ("sim.schemas.common", {
+        "system.metrics": "MetricsEvent",
+        "system.alert": "AlertEvent",
+        "error.occurred": "AlertEvent",
+        "db.connections": "MetricsEvent",
+    }),
+    "payment": ("sim.schemas.common", {"transaction.created": "TransactionEvent"}),
+    "inventory": ("sim.schemas.common", {"stock.updated": "MetricsEvent"}),
+    "shipping": ("sim.schemas.common", {"shipment.created": "TransactionEvent"}),
+}
+
+# Schemas registered with the decorator, shared by every registry
+_PLUGIN_SCHEMAS: Dict[Tuple[str, str], Type[BaseModel]] = {}
+
+def register_schema(source: str, *events: str) -> Callable[[Type[BaseModel]], Type[BaseModel]]:
+    """
+    Class decorator registering a schema for one or more events of a source.
+    
+    Plugin schemas take precedence over built-in ones; schemas registered
+    on a registry with `EventRegistry.register` take precedence over both.
+    
+    Example:
+        @register_schema("stripe", "charge.succeeded", "charge.failed")
+        class ChargeEvent(BaseModel):
+            amount: int
+    """
+    def register(schema: Type[BaseModel]) -> Type[BaseModel]:
+        for event in events:
+            _PLUGIN_SCHEMAS[(source, event)] = schema
+        return schema
+    return register
+
+_ENTRY_POINTS: Optional[Dict[str, Any]] = None
+
+def _schema_entry_points() -> Dict[str, Any]:
+    """Installed schema plugin entry points by source, scanned once per process."""
+    global _ENTRY_POINTS
+    if _ENTRY_POINTS is None:
+        from importlib.metadata import entry_points
+        found = entry_points()
+        if hasattr(found, "select"):
+            group = found.select(group=ENTRY_POINT_GROUP)
+        else:  # Python < 3.10
+            group = found.get(ENTRY_POINT_GROUP, [])
+        _ENTRY_POINTS = {entry_point.name: entry_point for entry_point in group}
+    return _ENTRY_POINTS
+
+# full: validate every event; first-n: validate the first N events per
+# (source, event) in a run and only coerce later ones to the same shape
+# (see `EventRegistry.get_coercer`); off: never validate
+VALIDATION_MODES = ("full", "first-n", "off")
+
+Validator = Callable[[dict], dict]
+
+def _contains_model(annotation: Any) -> bool:
+    """Check whether a type annotation refers to a pydantic model anywhere."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_contains_model(arg) for arg in get_args(annotation))
+
+def _is_plain_schema(schema: Type[BaseModel]) -> bool:
+    """Check whether a schema can be validated as a TypedDict without changing its output."""
+    # Other config options (strict, use_enum_values, str_*, ...) and computed
+    # fields change what the model gives, so they need the model itself
+    config = schema.model_config
+    if any(key != "extra" for key in config) or config.get("extra") not in (None, "ignore"):
+        return False
+    if schema.model_computed_fields:
+        return False
+    decorators = schema.__pydantic_decorators__
+    if decorators.validators or decorators.field_validators or decorators.model_validators:
+        return False
+    for info in schema.model_fields.values():
+        if info.alias or info.exclude or _contains_model(info.annotation):
+            return False
+    return True
+
+def _build_validator(schema: Type[BaseModel]) -> Validator:
+    """
+    Build a validator that turns raw event data into validated data.
+
+    Flat schemas are validated as a TypedDict with the same field types and
+    constraints, so data goes dict to dict with no model instance or
+    `model_dump()` in between. Anything else falls back to the model round trip.
+    """
+    if not _is_plain_schema(schema):
+        return lambda data: schema(**data).model_dump()
+    
+    fields = {}
+    defaults: Dict[str, Any] = {}
+    for name, info in schema.model_fields.items():
+        annotation = Annotated[(info.annotation, *info.metadata)] if info.metadata else info.annotation
+        if info.is_required():
+            fields[name] = annotation
+        else:
+            fields[name] = NotRequired[annotation]
+            defaults[name] = info
+    adapter = TypeAdapter(TypedDict(f"{schema.__name__}Data", fields))
+    names = list(schema.model_fields)
+    
+    def validate(data: dict) -> dict:
+        validated = adapter.validate_python(data)
+        if len(validated) == len(names):
+            return validated
+        # Keep the model's field order and fill in defaults like model_dump would
+        return {
+            name: validated[name] if name in validated
+            else defaults[name].get_default(call_default_factory=True)
+            for name in names
+        }
+    
+    return validate
+
+# Field types whose raw values already have the validated type, give or
+# take an int in a float field
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+def _is_float(annotation: Any) -> bool:
+    """Check whether a field is a float, possibly Optional or constrained."""
+    if annotation is float:
+        return True
+    args = get_args(annotation)
+    return bool(args) and all(arg is float or arg is type(None) for arg in args)
+
+def _is_plain_type(annotation: Any, config: Dict[str, Any]) -> bool:
+    """Check whether a field's values can be copied as they are, possibly Optional."""
+    if annotation is str:
+        # Validation rewrites strings under the str_* options
+        return not any(key.startswith("str_") for key in config)
+    if annotation in _PLAIN_TYPES:
+        return True
+    args = get_args(annotation)
+    return bool(args) and get_origin(annotation) in (Union, UnionType) and all(
+        _is_plain_type(arg, config) for arg in args
+    )
+
+def _field_coercer(info: FieldInfo, config: Dict[str, Any]) -> Callable[[Any], Any]:
+    """Convert a field's raw values to the types validation gives them."""
+    annotation = Annotated[(info.annotation, *info.metadata)] if info.metadata else info.annotation
+    try:
+        adapter = TypeAdapter(annotation, config=config or None)
+    except PydanticUserError:
+        # Models and other types with a config of their own take no other
+        adapter = TypeAdapter(annotation)
+    if _contains_model(info.annotation):
+        # Nested models come out of validation as dicts
+        return lambda value: adapter.dump_python(adapter.validate_python(value))
+    return adapter.validate_python
+
+def _build_coercer(schema: Type[BaseModel]) -> Validator:
+    """
+    Build a cheap stand-in for validation, giving trusted data the validated shape.
+
+    Fields come out under their names in the schema's order, with defaults
+    filled in and the types validation would give them. Values of plain
+    types (str, int, float, bool) are copied, with ints in float fields
+    turned into floats; other fields, such as datetimes, UUIDs, Enums and
+    nested models, go through a TypeAdapter of the field alone. Validators
+    of the model are not run. Schemas with computed fields are validated.
+    """
+    if schema.model_computed_fields:
+        return _build_validator(schema)
+    config = {key: value for key, value in schema.model_config.items() if key != "extra"}
+    fields = []
+    for name, info in schema.model_fields.items():
+        convert = None if _is_plain_type(info.annotation, config) else _field_coercer(info, config)
+        fields.append((name, info.alias or name, info, _is_float(info.annotation), convert))
+    keep_extra = schema.model_config.get("extra") == "allow"
+    keys = {key for _, key, _, _, _ in fields}
+    
+    def coerce(data: dict) -> dict:
+        coerced = {}
+        for name, key, info, is_float, convert in fields:
+            if key in data:
+                value = data[key]
+                if convert is not None:
+                    value = convert(value)
+                elif is_float and type(value) is int:
+                    value = float(value)
+                coerced[name] = value
+            elif not info.is_required():
+                coerced[name] = info.get_default(call_default_factory=True)
+        if keep_extra:
+            coerced.update((key, value) for key, value in data.items() if key not in keys)
+        return coerced
+    
+    return coerce
 
 class EventRegistry:
-    """Registry mapping event types to their schemas."""
+    """
+    Registry mapping event types to their schemas.
+    
+    Schemas are discovered lazily: the first lookup of a built-in source
+    imports its schema module, and only a lookup that finds nothing there
+    scans the installed `autosource.schemas` entry points for a plugin
+    named after the source. Schemas registered with `register_schema` are
+    picked up whenever their module has been imported.
+    """
     
     def __init__(self):
         self._schemas: Dict[Tuple[str, str], Type[BaseModel]] = {}
-        self._register_schemas()
-    
-    def _register_schemas(self):
-        """Register all available event schemas."""
-        # Analytics events
-        self._schemas[("analytics", "page.view")] = AnalyticsEvent
-        self._schemas[("analytics", "search.performed")] = AnalyticsEvent
-        self._schemas[("analytics", "feature.usage")] = AnalyticsEvent
-        self._schemas[("analytics", "user.signup")] = UserEvent
-        
-        # Monitoring events
-        self._schemas[("monitoring", "system.metrics")] = MetricsEvent
-        self._schemas[("monitoring", "system.alert")] = AlertEvent
-        self._schemas[("monitoring", "error.occurred")] = AlertEvent
-        self._schemas[("monitoring", "db.connections")] = MetricsEvent
-        
-        # Business events
-        self._schemas[("payment", "transaction.created")] = TransactionEvent
-        self._schemas[("inventory", "stock.updated")] = MetricsEvent
-        self._schemas[("shipping", "shipment.created")] = TransactionEvent
+        self._validators: Dict[Tuple[str, str], Validator] = {}
+        self._coercers: Dict[Tuple[str, str], Validator] = {}
+        self._fill_plans: Dict[Tuple[str, str], Dict[FrozenSet[str], DataPlan]] = {}
+        self._loaded_plugins: Set[str] = set()
+    
+    def register(self, source: str, event: str, schema: Type[BaseModel]) -> None:
+        """Register a schema for an event type on this registry."""
+        key = (source, event)
+        self._schemas[key] = schema
+        self._validators.pop(key, None)
+        self._coercers.pop(key, None)
+        self._fill_plans.pop(key, None)
     
     def get_schema(self, source: str, event: str) -> Type[BaseModel]:
-        """Get the schema for a given event type."""
+        """Get the schema for a given event type, loading its source on first use."""
         key = (source, event)
-        if key not in self._schemas:
+        schema = self._schemas.get(key)
+        if schema is not None:
+            return schema
+        
+        schema = _PLUGIN_SCHEMAS.get(key) or self._builtin_schema(source, event)
+        if schema is None and source not in self._loaded_plugins:
+            self._loaded_plugins.add(source)
+            entry_point = _schema_entry_points().get(source)
+            if entry_point is not None:
+                entry_point.load()
+                schema = _PLUGIN_SCHEMAS.get(key)
+        if schema is None:
             raise ValueError(f"No schema registered for event: {source}.{event}")
-        return self._schemas[key]
+        self._schemas[key] = schema
+        return schema
+    
+    def has_schema(self, source: str, event: str) -> bool:
+        """Check whether an event type has a schema, loading its source on first use."""
+        try:
+            self.get_schema(source, event)
+        except ValueError:
+            return False
+        return True
+    
+    def _builtin_schema(self, source: str, event: str) -> Optional[Type[BaseModel]]:
+        """Look up a built-in schema, importing its module on first use."""
+        builtin = BUILTIN_SCHEMAS.get(source)
+        if builtin is None or event not in builtin[1]:
+            return None
+        module_name, schemas = builtin
+        return getattr(import_module(module_name), schemas[event])
+    
+    def get_validator(self, source: str, event: str) -> Validator:
+        """Get the cached validator for a given event type."""
+        key = (source, event)
+        validator = self._validators.get(key)
+        if validator is None:
+            validator = _build_validator(self.get_schema(source, event))
+            self._validators[key] = validator
+        return validator
+    
+    def get_coercer(self, source: str, event: str) -> Validator:
+        """Get the cached coercer giving unvalidated data of an event type its validated shape."""
+        key = (source, event)
+        coercer = self._coercers.get(key)
+        if coercer is None:
+            coercer = _build_coercer(self.get_schema(source, event))
+            self._coercers[key] = coercer
+        return coercer
+    
+    def get_fill_plan(self, source: str, event: str, present: Collection[str] = ()) -> DataPlan:
+        """
+        Get the cached plan generating the required fields of an event type (see `sim.autofill`).
+        
+        Fields in `present` are left out, so only the fields a story does not
+        set need a type that can be generated.
+        """
+        plans = self._fill_plans.setdefault((source, event), {})
+        key = frozenset(present)
+        plan = plans.get(key)
+        if plan is None:
+            plan = plan_schema(self.get_schema(source, event), exclude=key)
+            plans[key] = plan
+        return plan
     
     def validate_data(self, source: str, event: str, data: dict) -> dict:
         """Validate event data against its schema."""
-        schema = self.get_schema(source, event)
-        validated = schema(**data)
-        return validated.model_dump()
+        return self.get_validator(source, event)(data)
     
     def list_events(self) -> list[Tuple[str, str]]:
-        """List all registered event types."""
-        return list(self._schemas.keys())
+        """List all registered event types, loading every built-in source and plugin."""
+        for entry_point in _schema_entry_points().values():
+            entry_point.load()
+        events = dict.fromkeys(self._schemas)
+        for source, (_, schemas) in BUILTIN_SCHEMAS.items():
+            events.update(dict.fromkeys((source, event) for event in schemas))
+        events.update(dict.fromkeys(_PLUGIN_SCHEMAS))
+        return list(events)
 
 # Global registry instance
 _REGISTRY: EventRegistry = None
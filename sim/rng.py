@@ -0,0 +1,12 @@
+import random
+from typing import Union
+
+from autosourcesim.rng import derive_seed
+
+def random_seed() -> int:
+    """Draw a fresh master seed from the operating system."""
+    return random.SystemRandom().getrandbits(63)
+
+def substream(master: int, *keys: Union[int, str]) -> random.Random:
+    """Split off an independent RNG for `keys` from a master seed."""
+    return random.Random(derive_seed(master, *keys))
@@ -1,24 +1,163 @@
+import math
 import re
 import random
-from typing import Any, Dict, Union, List
+import uuid
+from datetime import datetime
+from functools import partial
+from itertools import count
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple, Union, List
+from autosourcesim.profiling import BoundProfiler, Profiler
 from .config import DataRule
-from .faker_utils import get_faker
+from .faker_utils import generate_id, make_faker
+from .text_pools import TextPool, get_text_pool
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+class DataPlan(NamedTuple):
+    """Parsed data dictionary: the raw values plus a plan for each dynamic field."""
+    template: Dict[str, Any]
+    fields: List[Tuple[str, Any]]
+
+class ListPlan(NamedTuple):
+    """Parsed list: the raw items plus a plan for each dict item or generated value (None otherwise)."""
+    items: List[Any]
+    item_plans: List[Optional[Union[DataPlan, DataRule]]]
+
+# Fixed choices of random_text(onboarding)
+ONBOARDING_TEMPLATES = [
+    "Complete user onboarding flow",
+    "Setup initial workspace configuration",
+    "First-time user experience improvements",
+    "Onboarding checklist implementation"
+]
+
+# Range datetime() rules draw from when given no arguments
+DEFAULT_DATETIME_RANGE = ("2024-01-01", "2025-01-01")
+
+# Rules that keep state across events or read other fields; only available
+# through compiled plans, where their evaluation order is fixed up front
+STATEFUL_RULES = frozenset({"counter", "walk", "ref", "prev", "pct_change"})
+
+def step_range(low: Union[int, float], high: Union[int, float], step: Union[int, float]) -> Tuple[int, int]:
+    """Range of k for which k * step lies in [low, high], for random(..., step=...)."""
+    if step <= 0:
+        raise ValueError("Random rule step must be positive")
+    first, last = math.ceil(low / step), math.floor(high / step)
+    if isinstance(step, int) and isinstance(low, int) and isinstance(high, int):
+        # Exact for integers of any size
+        first, last = -(-low // step), high // step
+    if first > last:
+        raise ValueError(f"No multiple of {step} between {low} and {high}")
+    return first, last
+
+def is_stateful(plan: Union[DataPlan, ListPlan, DataRule, None]) -> bool:
+    """Check whether a plan uses any stateful rule, at any depth."""
+    if isinstance(plan, DataRule):
+        return plan.type in STATEFUL_RULES
+    if isinstance(plan, ListPlan):
+        return any(is_stateful(item_plan) for item_plan in plan.item_plans)
+    if isinstance(plan, DataPlan):
+        return any(is_stateful(field_plan) for _, field_plan in plan.fields)
+    return False
+
+# Slot value before the first event
+_MISSING = object()
+
+def _dependency_order(fields: List[Tuple[str, Any]], template: Dict[str, Any]) -> List[str]:
+    """Order dynamic fields so those read by ref/pct_change come first."""
+    dynamic = [key for key, _ in fields]
+    depends: Dict[str, List[str]] = {}
+    for key, field_plan in fields:
+        depends[key] = []
+        if isinstance(field_plan, DataRule) and field_plan.type in ("ref", "prev", "pct_change"):
+            if len(field_plan.args) != 1:
+                raise ValueError(f"{field_plan.type} rule requires exactly 1 argument: field")
+            field = field_plan.args[0]
+            if field not in template:
+                raise ValueError(f"{field_plan.type}({field}) refers to an unknown field")
+            # prev reads the previous event, so it does not constrain the order
+            if field_plan.type != "prev" and field in dynamic:
+                depends[key].append(field)
+    
+    order: List[str] = []
+    state: Dict[str, int] = {}
+    
+    def visit(key: str, chain: List[str]) -> None:
+        if state.get(key) == 2:
+            return
+        if state.get(key) == 1:
+            raise ValueError("Field reference cycle: " + " -> ".join(chain + [key]))
+        state[key] = 1
+        for field in depends[key]:
+            visit(field, chain + [key])
+        state[key] = 2
+        order.append(key)
+    
+    for key in dynamic:
+        visit(key, [])
+    return order
 
 class RuleResolver:
-    """Resolves dynamic field generation rules in event data."""
+    """
+    Resolves dynamic field generation rules in event data.
+    
+    Args:
+        rng: RNG all rules draw from; a fresh unseeded one by default
+        faker: Faker instance for text rules; by default one is created on
+            first use that draws from `rng`
+        pool: Text pool to sample text rules from instead of calling Faker
+            per value. Rules with a `cardinality` argument always use a pool,
+            falling back to the default one
+        params: Tenant parameters available to `tenant(name)` rules
+        profiler: Optional profiler (or bound profiler view) that compiled
+            rules record their calls with, under "rule.<type>"
+    """
     
     RULE_PATTERN = re.compile(r'^(\w+)\((.*)\)$')
     
-    def __init__(self):
-        self.faker = get_faker()
+    def __init__(
+        self,
+        rng: Optional[random.Random] = None,
+        faker: Optional["Faker"] = None,
+        pool: Optional[TextPool] = None,
+        params: Optional[Dict[str, Any]] = None,
+        profiler: Optional[Union[Profiler, BoundProfiler]] = None
+    ):
+        self.rng = rng or random.Random()
+        self._faker = faker
+        self.pool = pool
+        self.params = params or {}
+        self.profiler = profiler
         self._register_resolvers()
 
+    @property
+    def faker(self) -> "Faker":
+        """Faker instance sharing this resolver's RNG, created on first use."""
+        if self._faker is None:
+            self._faker = make_faker(self.rng)
+        return self._faker
+
     def _register_resolvers(self):
         """Register all available rule resolvers."""
         self._resolvers = {
             'random': self._resolve_random,
             'static': self._resolve_static,
-            'random_text': self._resolve_random_text
+            'random_text': self._resolve_random_text,
+            'tenant': self._resolve_tenant,
+            'choice': self._resolve_choice,
+            'id': self._resolve_id,
+            'uuid4': self._resolve_uuid4,
+            'datetime': self._resolve_datetime
+        }
+        # Specialized compilers; rule types without one fall back to their resolver
+        self._compilers = {
+            'random': self._compile_random,
+            'static': self._compile_static,
+            'random_text': self._compile_random_text,
+            'tenant': self._compile_tenant,
+            'choice': self._compile_choice,
+            'datetime': self._compile_datetime
         }
 
     def parse_rule(self, rule_str: str) -> DataRule:
@@ -62,6 +201,8 @@ class RuleResolver:
 
     def resolve_rule(self, rule: DataRule) -> Any:
         """Resolve a DataRule into a concrete value."""
+        if rule.type in STATEFUL_RULES:
+            raise ValueError(f"Stateful rule {rule.type} is only available in compiled data")
         if rule.type not in self._resolvers:
             raise ValueError(f"Unknown rule type: {rule.type}")
         
@@ -69,13 +210,7 @@ class RuleResolver:
 
     def _resolve_random(self, args: List[Any], kwargs: Dict[str, Any]) -> Union[int, float]:
         """Resolve a random number rule."""
-        if len(args) != 2:
-            raise ValueError("Random rule requires exactly 2 arguments: min and max")
-        
-        min_val, max_val = args
-        if isinstance(min_val, float) or isinstance(max_val, float):
-            return random.uniform(min_val, max_val)
-        return random.randint(min_val, max_val)
+        return self._compile_random(args, kwargs)()
 
     def _resolve_static(self, args: List[Any], kwargs: Dict[str, Any]) -> Any:
         """Resolve a static value rule."""
@@ -85,21 +220,332 @@ class RuleResolver:
 
     def _resolve_random_text(self, args: List[Any], kwargs: Dict[str, Any]) -> str:
         """Resolve a random text generation rule."""
+        return self._compile_random_text(args, kwargs)()
+
+    def _resolve_tenant(self, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Resolve a tenant parameter rule."""
+        if len(args) != 1:
+            raise ValueError("Tenant rule requires exactly 1 argument: parameter name")
+        if args[0] not in self.params:
+            raise ValueError(f"Unknown tenant parameter: {args[0]}")
+        return self.params[args[0]]
+
+    def _resolve_choice(self, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Resolve a rule picking one of its arguments."""
+        return self._compile_choice(args, kwargs)()
+
+    def _resolve_id(self, args: List[Any], kwargs: Dict[str, Any]) -> str:
+        """Resolve a random ID rule, e.g. id(txn) -> "txn_k3v9x0ab"."""
+        if len(args) > 1:
+            raise ValueError("ID rule takes at most 1 argument: prefix")
+        prefix = str(args[0]) if args else ""
+        return generate_id(self.rng, prefix, kwargs.get("length", 8))
+
+    def _resolve_uuid4(self, args: List[Any], kwargs: Dict[str, Any]) -> str:
+        """Resolve a random UUID rule, drawn from the resolver's RNG."""
+        if args:
+            raise ValueError("UUID rule takes no arguments")
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _resolve_datetime(self, args: List[Any], kwargs: Dict[str, Any]) -> str:
+        """Resolve a random datetime rule."""
+        return self._compile_datetime(args, kwargs)()
+
+    def compile_rule(self, rule: DataRule) -> Callable[[], Any]:
+        """Compile a DataRule into a zero-argument function producing its values."""
+        if rule.type in ("counter", "walk"):
+            return self._wrap_profiled(rule, self._compile_series(rule))
+        if rule.type in STATEFUL_RULES:
+            raise ValueError(f"Rule {rule.type} reads other fields and needs a data plan")
+        if rule.type not in self._resolvers:
+            raise ValueError(f"Unknown rule type: {rule.type}")
+        
+        compiler = self._compilers.get(rule.type)
+        if compiler is not None:
+            producer = compiler(rule.args, rule.kwargs)
+        else:
+            producer = partial(self._resolvers[rule.type], rule.args, rule.kwargs)
+        return self._wrap_profiled(rule, producer)
+
+    def _wrap_profiled(self, rule: DataRule, producer: Callable[[], Any]) -> Callable[[], Any]:
+        """Record a compiled rule's calls with the profiler, if any."""
+        if self.profiler is not None:
+            return self.profiler.wrap(f"rule.{rule.type}", producer)
+        return producer
+
+    def _compile_random(self, args: List[Any], kwargs: Dict[str, Any]) -> Callable[[], Union[int, float]]:
+        """
+        Compile a random number rule.
+        
+        random(min, max) draws integers (inclusive) or, if either bound is a
+        float, floats between min and max; with `step`, only multiples of
+        step between them, e.g. random(0, 100, step=5).
+        """
+        if len(args) != 2:
+            raise ValueError("Random rule requires exactly 2 arguments: min and max")
+        
+        min_val, max_val = args
+        step = kwargs.get("step")
+        if step is not None:
+            low, high = step_range(min_val, max_val, step)
+            randint = self.rng.randint
+            return lambda: randint(low, high) * step
+        if isinstance(min_val, float) or isinstance(max_val, float):
+            return partial(self.rng.uniform, min_val, max_val)
+        return partial(self.rng.randint, min_val, max_val)
+
+    def _compile_static(self, args: List[Any], kwargs: Dict[str, Any]) -> Callable[[], Any]:
+        """Compile a static value rule."""
+        if len(args) != 1:
+            raise ValueError("Static rule requires exactly 1 argument")
+        value = args[0]
+        return lambda: value
+
+    def _compile_random_text(self, args: List[Any], kwargs: Dict[str, Any]) -> Callable[[], str]:
+        """Compile a random text generation rule."""
         if len(args) != 1:
             raise ValueError("Random text rule requires exactly 1 argument: category")
         
         category = args[0]
         # Use faker to generate contextual random text
         if category == "onboarding":
-            templates = [
-                "Complete user onboarding flow",
-                "Setup initial workspace configuration",
-                "First-time user experience improvements",
-                "Onboarding checklist implementation"
+            return partial(self.rng.choice, ONBOARDING_TEMPLATES)
+        
+        cardinality = kwargs.get("cardinality")
+        max_length = kwargs.get("max_length")
+        min_length = kwargs.get("min_length")
+        if cardinality is not None or max_length is not None or min_length is not None or self.pool is not None:
+            pool = self.pool or get_text_pool()
+            return pool.sampler(category, self.rng, cardinality, max_length, min_length)
+        
+        return self.faker.sentence
+
+    def _compile_tenant(self, args: List[Any], kwargs: Dict[str, Any]) -> Callable[[], Any]:
+        """Compile a tenant parameter rule."""
+        value = self._resolve_tenant(args, kwargs)
+        return lambda: value
+
+    def _compile_choice(self, args: List[Any], kwargs: Dict[str, Any]) -> Callable[[], Any]:
+        """Compile a rule picking one of its arguments."""
+        if not args:
+            raise ValueError("Choice rule requires at least 1 argument")
+        return partial(self.rng.choice, list(args))
+
+    def _compile_datetime(self, args: List[Any], kwargs: Dict[str, Any]) -> Callable[[], str]:
+        """
+        Compile a random datetime rule.
+        
+        datetime(start, end) draws instants uniformly between two ISO dates
+        or datetimes (DEFAULT_DATETIME_RANGE without arguments), formatted
+        as ISO strings or with a strftime `format`, e.g. format=%Y-%m-%d.
+        """
+        if len(args) not in (0, 2):
+            raise ValueError("Datetime rule takes 0 or 2 arguments: start and end")
+        start, end = (datetime.fromisoformat(str(value)) for value in (args or DEFAULT_DATETIME_RANGE))
+        if end <= start:
+            raise ValueError("Datetime rule requires end after start")
+        span = end - start
+        format = kwargs.get("format")
+        draw = self.rng.random
+        
+        def resolve() -> str:
+            value = start + draw() * span
+            return value.strftime(format) if format else value.isoformat()
+        
+        return resolve
+
+    def _compile_series(self, rule: DataRule) -> Callable[[], Union[int, float]]:
+        """
+        Compile a rule producing a series across events.
+        
+        counter(start=0, step=1) counts up by `step`; walk(start, step) is a
+        random walk moving up to `step` per event, optionally kept within
+        `min`/`max`. Integer arguments give integer steps.
+        """
+        args, kwargs = rule.args, rule.kwargs
+        if rule.type == "counter":
+            if len(args) > 2:
+                raise ValueError("Counter rule takes at most 2 arguments: start and step")
+            start = args[0] if args else kwargs.get("start", 0)
+            step = args[1] if len(args) > 1 else kwargs.get("step", 1)
+            return count(start, step).__next__
+        
+        if len(args) != 2:
+            raise ValueError("Walk rule requires exactly 2 arguments: start and step")
+        start, step = args
+        low = kwargs.get("min", float("-inf"))
+        high = kwargs.get("max", float("inf"))
+        if isinstance(start, int) and isinstance(step, int):
+            draw = partial(self.rng.randint, -step, step)
+        else:
+            draw = partial(self.rng.uniform, -step, step)
+        state = [start]
+        
+        def walk() -> Union[int, float]:
+            value = state[0]
+            state[0] = min(max(value + draw(), low), high)
+            return value
+        
+        return walk
+
+    def _compile_reference(
+        self,
+        rule: DataRule,
+        frame: List[Optional[Dict[str, Any]]],
+        last: List[Any],
+        slot: Optional[int]
+    ) -> Callable[[], Any]:
+        """
+        Compile a rule reading a sibling field of the current or previous event.
+        
+        `frame[0]` holds the dict being resolved and `last[slot]` the field's
+        value in the previous event.
+        """
+        if len(rule.args) != 1:
+            raise ValueError(f"{rule.type} rule requires exactly 1 argument: field")
+        field = rule.args[0]
+        
+        if rule.type == "ref":
+            return lambda: frame[0][field]
+        if rule.type == "prev":
+            default = rule.kwargs.get("default")
+            
+            def prev() -> Any:
+                value = last[slot]
+                return default if value is _MISSING else value
+            
+            return prev
+        
+        def pct_change() -> float:
+            previous = last[slot]
+            if previous is _MISSING or not previous:
+                return 0.0
+            return (frame[0][field] - previous) / previous * 100
+        
+        return pct_change
+
+    def plan_data(self, data: Dict[str, Any]) -> DataPlan:
+        """
+        Parse a data dictionary into a plan of static fields and rules.
+        
+        Plans hold no RNG or other per-run state, so they can be cached and
+        pickled and are bound to a resolver with `compile_plan`.
+        """
+        template: Dict[str, Any] = {}
+        fields: List[Tuple[str, Any]] = []
+        
+        for key, value in data.items():
+            template[key] = value
+            if isinstance(value, str):
+                rule = self.parse_rule(value)
+                if rule:
+                    fields.append((key, rule))
+            elif isinstance(value, dict):
+                fields.append((key, self.plan_data(value)))
+            elif isinstance(value, list):
+                fields.append((key, ListPlan(
+                    value,
+                    [self.plan_data(item) if isinstance(item, dict) else None for item in value]
+                )))
+        
+        return DataPlan(template, fields)
+
+    def compile_plan(self, plan: Union[DataPlan, ListPlan, DataRule]) -> Callable[[], Any]:
+        """Bind a plan to this resolver, producing a zero-argument generator."""
+        if isinstance(plan, DataRule):
+            return self.compile_rule(plan)
+        if isinstance(plan, ListPlan):
+            return self._compile_list(plan)
+        
+        template = plan.template
+        if not any(
+            isinstance(field_plan, DataRule) and field_plan.type in STATEFUL_RULES
+            for _, field_plan in plan.fields
+        ):
+            dynamic = [(key, self.compile_plan(field_plan)) for key, field_plan in plan.fields]
+            
+            def generate() -> Dict[str, Any]:
+                resolved = template.copy()
+                for key, producer in dynamic:
+                    resolved[key] = producer()
+                return resolved
+            
+            return generate
+        
+        return self._compile_stateful(plan)
+
+    def _compile_stateful(self, plan: DataPlan) -> Callable[[], Dict[str, Any]]:
+        """
+        Compile a data plan whose fields read each other or previous events.
+        
+        Fields are ordered once so every `ref`/`pct_change` runs after the
+        field it reads. Values read by `prev`/`pct_change` are kept in a
+        slot list and updated after each event.
+        """
+        template = plan.template
+        rules = dict(plan.fields)
+        order = _dependency_order(plan.fields, template)
+        
+        tracked = []
+        for _, field_plan in plan.fields:
+            if isinstance(field_plan, DataRule) and field_plan.type in ("prev", "pct_change"):
+                if field_plan.args and field_plan.args[0] not in tracked:
+                    tracked.append(field_plan.args[0])
+        frame: List[Optional[Dict[str, Any]]] = [None]
+        last = [_MISSING] * len(tracked)
+        
+        dynamic = []
+        for key in order:
+            field_plan = rules[key]
+            if isinstance(field_plan, DataRule) and field_plan.type in ("ref", "prev", "pct_change"):
+                field = field_plan.args[0] if field_plan.args else None
+                slot = tracked.index(field) if field in tracked else None
+                producer = self._wrap_profiled(
+                    field_plan, self._compile_reference(field_plan, frame, last, slot)
+                )
+            else:
+                producer = self.compile_plan(field_plan)
+            dynamic.append((key, producer))
+        tracked_slots = list(enumerate(tracked))
+        
+        def generate() -> Dict[str, Any]:
+            resolved = template.copy()
+            frame[0] = resolved
+            for key, producer in dynamic:
+                resolved[key] = producer()
+            for slot, field in tracked_slots:
+                last[slot] = resolved[field]
+            return resolved
+        
+        return generate
+
+    def compile_data(self, data: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+        """
+        Compile a data dictionary into a function that resolves it.
+
+        Rule strings are parsed once here; the returned function only copies
+        the static fields and calls the precompiled generator of each dynamic
+        field, producing the same result as `resolve_data`.
+        """
+        return self.compile_plan(self.plan_data(data))
+
+    def _compile_list(self, plan: ListPlan) -> Callable[[], List[Any]]:
+        """Compile a list whose dict items are resolved and other items kept as-is."""
+        items = plan.items
+        producers = [
+            self.compile_plan(item_plan) if item_plan is not None else None
+            for item_plan in plan.item_plans
+        ]
+        if not any(producers):
+            return items.copy
+        
+        def generate() -> List[Any]:
+            return [
+                producer() if producer else item
+                for producer, item in zip(producers, items)
             ]
-            return random.choice(templates)
         
-        return self.faker.sentence()
+        return generate
 
     def resolve_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Recursively resolve all rules in a data dictionary."""
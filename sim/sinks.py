@@ -0,0 +1,492 @@
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union
+from uuid import UUID
+
+from .columns import ColumnBatch
+from .config import Event
+from .timing import UniformTimes
+
+DEFAULT_BATCH_SIZE = 65_536
+DEFAULT_BUFFER_SIZE = 1 << 20
+DEFAULT_SCHEMA_ROWS = 1 << 20
+
+NDJSON_COMPRESSIONS = (None, "gzip", "zstd")
+
+COLUMNAR_FORMATS = ("parquet", "ipc")
+
+# struct: one struct column holding the data fields; flatten: one
+# "data.<field>" column per data field; json: data serialized as a string
+DATA_LAYOUTS = ("struct", "flatten", "json")
+
+def _event_name(event: Any) -> str:
+    """Event type of a story Event or an autosourcesim event."""
+    name = getattr(event, "event", None)
+    return name if name is not None else event.event_type
+
+class ColumnarSink:
+    """
+    Write events to a Parquet or Arrow IPC file in columnar record batches.
+    
+    Events are buffered column by column and written every `batch_size`
+    events, with the fixed columns `source`, `event`, `org_id` and
+    `timestamp` plus the event data in the chosen layout. The file schema
+    holds the union of the data fields of the first `schema_rows` rows,
+    which are kept in memory until then (or until the sink is closed);
+    events without a field get nulls. Data fields first seen after the file
+    is opened raise a ValueError instead of being dropped silently. When no
+    event has data fields, the struct layout writes a null `data` column.
+    
+    Accepts story `Event`s as well as `autosourcesim` events, and
+    `ColumnBatch`es from `SimulationEngine.stream_columns`, whose columns
+    are written as-is without building a dict per row. Requires pyarrow.
+    
+    Args:
+        path: File to write
+        format: "parquet" or "ipc" (Arrow IPC file)
+        batch_size: Events per record batch
+        data_layout: "struct", "flatten" or "json"
+        compression: Optional codec passed to the writer, e.g. "zstd"
+        schema_rows: Rows to collect data fields from before opening the file
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        format: str = "parquet",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        data_layout: str = "struct",
+        compression: Optional[str] = None,
+        schema_rows: int = DEFAULT_SCHEMA_ROWS
+    ):
+        if format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format: {format}")
+        if data_layout not in DATA_LAYOUTS:
+            raise ValueError(f"Unknown data layout: {data_layout}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError("ColumnarSink requires pyarrow: pip install pyarrow") from e
+        self._pa = pyarrow
+        self.path = Path(path)
+        self.format = format
+        self.batch_size = batch_size
+        self.data_layout = data_layout
+        self.compression = compression
+        self.schema_rows = schema_rows
+        self.rows_written = 0
+        self._writer = None
+        self._schema = None
+        self._data_type = None
+        self._pending: List[Tuple[List[Any], Any]] = []
+        self._pending_rows = 0
+        self._reset_buffers()
+    
+    def _reset_buffers(self) -> None:
+        self._sources: List[str] = []
+        self._events: List[str] = []
+        self._org_ids: List[Optional[str]] = []
+        self._timestamps: List[Any] = []
+        self._data: List[Dict[str, Any]] = []
+    
+    def write(self, event: Any) -> None:
+        """Buffer one event, writing a record batch when the buffer is full."""
+        self._sources.append(event.source)
+        self._events.append(_event_name(event))
+        self._org_ids.append(getattr(event, "org_id", None))
+        self._timestamps.append(event.timestamp)
+        self._data.append(event.data)
+        if len(self._sources) >= self.batch_size:
+            self.flush()
+    
+    def write_batch(self, batch: ColumnBatch) -> None:
+        """Write a column batch as one record batch, after any buffered events."""
+        self.flush()
+        if batch.num_rows:
+            self._write(*self._build_column_batch(batch))
+    
+    def write_all(self, events: Iterable[Any]) -> int:
+        """Write every event or column batch from an iterable and return how many rows were written."""
+        count = 0
+        for event in events:
+            if isinstance(event, ColumnBatch):
+                self.write_batch(event)
+                count += event.num_rows
+                continue
+            self.write(event)
+            count += 1
+        return count
+    
+    def flush(self) -> None:
+        """Write buffered events as one record batch."""
+        if not self._sources:
+            return
+        self._write(*self._build_batch())
+        self._reset_buffers()
+    
+    def _write(self, fixed: List[Any], data: Any) -> None:
+        """Write rows, holding them back until the file schema is known."""
+        if self._writer is None:
+            self._pending.append((fixed, data))
+            self._pending_rows += len(data)
+            if self._pending_rows >= self.schema_rows or self.data_layout == "json":
+                self._open_pending()
+            return
+        self._write_rows(fixed, self._conform(data))
+    
+    def _write_rows(self, fixed: List[Any], data: Any) -> None:
+        batch = self._record_batch(fixed, data)
+        if batch.schema != self._schema:
+            batch = batch.cast(self._schema)
+        self._writer.write_batch(batch)
+        self.rows_written += batch.num_rows
+    
+    def _open_pending(self) -> None:
+        """Open the file with the union of the pending rows' data fields, then write them."""
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        self._data_type = self._union_type([data.type for _, data in pending])
+        pending = [(fixed, self._conform(data)) for fixed, data in pending]
+        self._open(self._record_batch(*pending[0]).schema)
+        for fixed, data in pending:
+            self._write_rows(fixed, data)
+    
+    def close(self) -> None:
+        """Flush remaining events and finish the file."""
+        self.flush()
+        if self._pending:
+            self._open_pending()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    def __enter__(self) -> "ColumnarSink":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _open(self, schema) -> None:
+        """Open the file writer with the file schema."""
+        pa = self._pa
+        self._schema = schema
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(str(self.path), schema, compression=self.compression or "snappy")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression) if self.compression else None
+            self._writer = pa.ipc.new_file(str(self.path), schema, options=options)
+    
+    def _build_batch(self) -> Tuple[List[Any], Any]:
+        """Turn the column buffers into fixed columns and a data column."""
+        pa = self._pa
+        if self.data_layout == "json":
+            data = pa.array([json.dumps(data, default=str) for data in self._data], pa.string())
+        else:
+            data = pa.array(self._data)
+        return self._fixed_columns(self._sources, self._events, self._org_ids, self._timestamps), data
+    
+    def _build_column_batch(self, batch: ColumnBatch) -> Tuple[List[Any], Any]:
+        """Turn a column batch into fixed columns and a data column, broadcasting its constant fields."""
+        pa = self._pa
+        rows = batch.num_rows
+        if self.data_layout == "json":
+            data = pa.array([json.dumps(data, default=str) for data in batch.rows()], pa.string())
+        else:
+            data = self._build_data_struct(batch)
+        fixed = self._fixed_columns(
+            [batch.source] * rows, [batch.event] * rows, [batch.org_id] * rows, batch.timestamps
+        )
+        return fixed, data
+    
+    def _fixed_columns(self, sources, events, org_ids, timestamps) -> List[Any]:
+        """Build the source, event, org_id and timestamp columns."""
+        pa = self._pa
+        if isinstance(timestamps, UniformTimes):
+            timestamps = timestamps.to_numpy() if timestamps.start.tzinfo is None else list(timestamps)
+        timestamps = pa.array(timestamps)
+        if pa.types.is_string(timestamps.type):
+            timestamps = timestamps.cast(pa.timestamp("us"))
+        return [
+            pa.array(sources, pa.string()),
+            pa.array(events, pa.string()),
+            pa.array(org_ids, pa.string()),
+            timestamps,
+        ]
+    
+    def _record_batch(self, fixed: List[Any], data: Any):
+        """Assemble a record batch from the fixed columns and the data column."""
+        pa = self._pa
+        columns = list(fixed)
+        names = ["source", "event", "org_id", "timestamp"]
+        
+        if self.data_layout in ("json", "struct"):
+            if self.data_layout == "struct" and data.type.num_fields == 0:
+                # Parquet cannot store a struct without fields
+                data = pa.nulls(len(data))
+            columns.append(data)
+            names.append("data")
+        else:
+            for field, child in zip(data.type, data.flatten()):
+                columns.append(child)
+                names.append(f"data.{field.name}")
+        return pa.RecordBatch.from_arrays(columns, names=names)
+    
+    def _union_type(self, types: List[Any]):
+        """Merge data types into one struct with every field, in order of appearance."""
+        pa = self._pa
+        if self.data_layout == "json":
+            return pa.string()
+        fields: Dict[str, Any] = {}
+        for data_type in types:
+            for field in data_type:
+                current = fields.get(field.name)
+                if current is None or pa.types.is_null(current.type):
+                    fields[field.name] = field
+                elif field.type != current.type and not pa.types.is_null(field.type):
+                    try:
+                        fields[field.name] = pa.unify_schemas(
+                            [pa.schema([current]), pa.schema([field])], promote_options="permissive"
+                        ).field(0)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        raise ValueError(
+                            f"Event data field {field.name} has types {current.type} and {field.type}; "
+                            "use data_layout='json'"
+                        ) from None
+        return pa.struct(list(fields.values()))
+    
+    def _conform(self, data: Any):
+        """Bring a data column to the file's data type, with nulls for absent fields."""
+        pa = self._pa
+        if data.type == self._data_type:
+            return data
+        children = {field.name: data.field(index) for index, field in enumerate(data.type)}
+        unknown = set(children) - {field.name for field in self._data_type}
+        if unknown:
+            raise ValueError(
+                f"Event data fields {sorted(unknown)} are not in the file schema; "
+                "use a larger schema_rows or data_layout='json'"
+            )
+        return pa.StructArray.from_arrays(
+            [
+                children[field.name].cast(field.type) if field.name in children
+                else pa.nulls(len(data), field.type)
+                for field in self._data_type
+            ],
+            fields=list(self._data_type)
+        )
+    
+    def _build_data_struct(self, batch: ColumnBatch):
+        """Build the struct array of a column batch's data."""
+        pa = self._pa
+        rows = batch.num_rows
+        names = list(dict.fromkeys([*batch.template, *batch.columns]))
+        if not names:
+            return pa.array([{}] * rows, pa.struct([]))
+        
+        def column(name: str):
+            if name in batch.columns:
+                return pa.array(batch.columns[name])
+            return pa.array([batch.template[name]] * rows)
+        
+        return pa.StructArray.from_arrays([column(name) for name in names], names=names)
+
+def write_columnar(events: Iterable[Any], path: Union[str, Path], **options: Any) -> int:
+    """
+    Write events to a Parquet or Arrow IPC file and return the row count.
+    
+    Example:
+        write_columnar(stream_story("stories/sales.yaml"), "sales.parquet")
+    """
+    with ColumnarSink(path, **options) as sink:
+        sink.write_all(events)
+    return sink.rows_written
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize the non-JSON types that appear in events."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _event_record(event: Any) -> Dict[str, Any]:
+    """Get the fields of a story Event, CompactEvent or pydantic event without validation."""
+    if isinstance(event, Event):
+        return {
+            "source": event.source,
+            "event": event.event,
+            "org_id": event.org_id,
+            "timestamp": event.timestamp,
+            "data": event.data,
+        }
+    fields = getattr(event, "fields", None)
+    if isinstance(event, tuple) and isinstance(fields, dict):
+        # CompactEvent: flatten its source-specific fields like the model would
+        return {
+            "source": event.source,
+            "event_type": event.event_type,
+            "timestamp": event.timestamp,
+            "metadata": {},
+            **fields,
+            "data": event.data,
+        }
+    return dict(vars(event))
+
+class NDJSONSink:
+    """
+    Write events as newline-delimited JSON through a large reusable buffer.
+    
+    Events are serialized straight from their fields with the C JSON encoder,
+    never through pydantic, and written whenever `buffer_size` characters
+    have accumulated. Output can be gzip or zstd compressed and rotated by
+    size or event count; rotated file names are made by formatting `path`
+    with `index` (e.g. "events-{index:05d}.ndjson.gz"), or by inserting
+    "-00000" before the suffixes if `path` has no placeholder.
+    
+    Accepts story `Event`s as well as `autosourcesim` events.
+    
+    Args:
+        path: File to write, or a pattern with an `{index}` placeholder
+        compression: None, "gzip" or "zstd" (requires zstandard)
+        compression_level: Optional codec level
+        buffer_size: Characters to buffer before each write
+        rotate_bytes: Start a new file once this many uncompressed bytes
+            would be exceeded
+        rotate_events: Start a new file after this many events
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        rotate_bytes: Optional[int] = None,
+        rotate_events: Optional[int] = None
+    ):
+        if compression not in NDJSON_COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError("zstd compression requires zstandard: pip install zstandard") from e
+        self.path = str(path)
+        self.compression = compression
+        self.compression_level = compression_level
+        self.buffer_size = buffer_size
+        self.rotate_bytes = rotate_bytes
+        self.rotate_events = rotate_events
+        self.events_written = 0
+        self.paths: List[Path] = []
+        self._encode = json.JSONEncoder(separators=(",", ":"), default=_json_default).encode
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._file: Optional[IO[bytes]] = None
+        self._file_bytes = 0
+        self._file_events = 0
+    
+    def write(self, event: Any) -> None:
+        """Serialize one event into the buffer."""
+        line = self._encode(_event_record(event))
+        size = len(line) + 1
+        if self._file is None or self._should_rotate(size):
+            self._rotate()
+        self._buffer.append(line)
+        self._buffered += size
+        self._file_bytes += size
+        self._file_events += 1
+        self.events_written += 1
+        if self._buffered >= self.buffer_size:
+            self.flush()
+    
+    def write_all(self, events: Iterable[Any]) -> int:
+        """Write every event from an iterable and return how many were written."""
+        count = 0
+        for event in events:
+            self.write(event)
+            count += 1
+        return count
+    
+    def flush(self) -> None:
+        """Write the buffered lines to the current file."""
+        if not self._buffer:
+            return
+        self._buffer.append("")
+        self._file.write("\n".join(self._buffer).encode())
+        self._buffer.clear()
+        self._buffered = 0
+    
+    def close(self) -> None:
+        """Flush the buffer and close the current file."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self) -> "NDJSONSink":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _should_rotate(self, size: int) -> bool:
+        if self.rotate_events is not None and self._file_events >= self.rotate_events:
+            return True
+        if self.rotate_bytes is not None and self._file_events:
+            return self._file_bytes + size > self.rotate_bytes
+        return False
+    
+    def _rotate(self) -> None:
+        """Close the current file and open the next one."""
+        self.close()
+        path = Path(self._file_name(len(self.paths)))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self._open(path)
+        self.paths.append(path)
+        self._file_bytes = 0
+        self._file_events = 0
+    
+    def _file_name(self, index: int) -> str:
+        if "{index" in self.path:
+            return self.path.format(index=index)
+        if self.rotate_bytes is None and self.rotate_events is None:
+            return self.path
+        path = Path(self.path)
+        suffixes = "".join(path.suffixes)
+        stem = path.name[:len(path.name) - len(suffixes)] if suffixes else path.name
+        return str(path.with_name(f"{stem}-{index:05d}{suffixes}"))
+    
+    def _open(self, path: Path) -> IO[bytes]:
+        if self.compression == "gzip":
+            level = self.compression_level if self.compression_level is not None else 6
+            return gzip.open(path, "wb", compresslevel=level)
+        if self.compression == "zstd":
+            import zstandard
+            level = self.compression_level if self.compression_level is not None else 3
+            return zstandard.ZstdCompressor(level=level).stream_writer(open(path, "wb"))
+        return open(path, "wb")
+
+def write_ndjson(events: Iterable[Any], path: Union[str, Path], **options: Any) -> int:
+    """
+    Write events as NDJSON and return how many were written.
+    
+    Example:
+        write_ndjson(stream.run(), "events-{index:05d}.ndjson.gz",
+                     compression="gzip", rotate_events=1_000_000)
+    """
+    with NDJSONSink(path, **options) as sink:
+        sink.write_all(events)
+    return sink.events_written
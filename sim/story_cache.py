@@ -0,0 +1,162 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+from .config import EventSpec, StoryConfig
+
+# Bump whenever the layout of CompiledStory or of rule plans changes
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_SIZE = 128
+DEFAULT_DISK_CACHE_SIZE = 1024
+
+def load_yaml(content: bytes) -> Any:
+    """Parse YAML with the fastest safe loader available."""
+    # Imported here so runs served from the story cache never load PyYAML
+    import yaml
+    # Prefer libyaml's C loader when PyYAML was built with it
+    return yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+def content_hash(content: bytes) -> str:
+    """Hash file contents for cache keys."""
+    return hashlib.sha256(content).hexdigest()
+
+@dataclass
+class CompiledStory:
+    """A story with its includes resolved and every spec's rules parsed."""
+    story: StoryConfig
+    events: List[EventSpec]
+    plans: List[Any]
+    # (resolved path, content hash) of the root story and every include it read
+    files: List[Tuple[str, str]] = field(default_factory=list)
+
+    def is_fresh(self) -> bool:
+        """Check that no file the story was compiled from has changed."""
+        for path, file_hash in self.files:
+            try:
+                with open(path, 'rb') as f:
+                    if content_hash(f.read()) != file_hash:
+                        return False
+            except OSError:
+                return False
+        return True
+
+class StoryCache:
+    """
+    In-memory and optional on-disk LRU cache of compiled stories.
+    
+    Entries are looked up by the resolved root path and are only used while
+    the contents of the root story and of every transitive include still
+    hash to the values recorded at compile time. On disk, entries are
+    pickles named after the root story's path and content hash; the least
+    recently used files are removed beyond `disk_maxsize`.
+    
+    Args:
+        maxsize: Compiled stories kept in memory; 0 disables the memory cache
+        cache_dir: Optional directory for the on-disk cache
+        disk_maxsize: Compiled stories kept on disk
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        cache_dir: Optional[Union[str, Path]] = None,
+        disk_maxsize: int = DEFAULT_DISK_CACHE_SIZE
+    ):
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.disk_maxsize = disk_maxsize
+        self._entries: "OrderedDict[str, CompiledStory]" = OrderedDict()
+    
+    def get(self, path: Union[str, Path]) -> Optional[CompiledStory]:
+        """Get the compiled story for a path if none of its files changed."""
+        root = str(Path(path).resolve())
+        compiled = self._entries.get(root)
+        if compiled is not None:
+            if compiled.is_fresh():
+                self._entries.move_to_end(root)
+                return compiled
+            del self._entries[root]
+        
+        compiled = self._load(root)
+        if compiled is not None:
+            self._remember(root, compiled)
+        return compiled
+    
+    def put(self, path: Union[str, Path], compiled: CompiledStory) -> None:
+        """Store a compiled story in memory and, if configured, on disk."""
+        root = str(Path(path).resolve())
+        self._remember(root, compiled)
+        self._store(root, compiled)
+    
+    def clear(self) -> None:
+        """Drop every in-memory entry."""
+        self._entries.clear()
+    
+    def _remember(self, root: str, compiled: CompiledStory) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[root] = compiled
+        self._entries.move_to_end(root)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def _disk_path(self, root: str) -> Optional[Path]:
+        """On-disk entry for the current contents of a root story."""
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(root, 'rb') as f:
+                root_hash = content_hash(f.read())
+        except OSError:
+            return None
+        name = hashlib.sha256(f"{CACHE_VERSION}\0{root}\0{root_hash}".encode()).hexdigest()
+        return self.cache_dir / f"{name}.pickle"
+    
+    def _load(self, root: str) -> Optional[CompiledStory]:
+        path = self._disk_path(root)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                compiled = pickle.load(f)
+        except Exception:
+            return None
+        if not isinstance(compiled, CompiledStory) or not compiled.is_fresh():
+            return None
+        os.utime(path)
+        return compiled
+    
+    def _store(self, root: str, compiled: CompiledStory) -> None:
+        path = self._disk_path(root)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+    
+    def _evict_disk(self) -> None:
+        """Remove the least recently used entries beyond `disk_maxsize`."""
+        entries = sorted(self.cache_dir.glob("*.pickle"), key=lambda p: p.stat().st_mtime)
+        for stale in entries[:max(0, len(entries) - self.disk_maxsize)]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+_STORY_CACHE: Optional[StoryCache] = None
+
+def get_story_cache() -> StoryCache:
+    """Get or create the default in-memory story cache."""
+    global _STORY_CACHE
+    if _STORY_CACHE is None:
+        _STORY_CACHE = StoryCache()
+    return _STORY_CACHE
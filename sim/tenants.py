@@ -0,0 +1,43 @@
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .config import StoryConfig
+from .rng import derive_seed, substream
+from .rule_resolver import RuleResolver
+from .text_pools import TextPool
+
+class Tenant(NamedTuple):
+    """One tenant of a story: its org_id, RNG seed and drawn parameters."""
+    org_id: str
+    seed: int
+    params: Dict[str, Any]
+    activity: float
+
+def expand_tenants(story: StoryConfig, seed: int, pool: Optional[TextPool] = None) -> List[Tenant]:
+    """
+    Expand a story into its tenants.
+
+    A story without a `tenants` section is a single tenant using the master
+    seed as is. Otherwise every tenant gets its own seed derived from the
+    master seed and its index, and its parameters and activity are drawn
+    once from a substream of that seed, so each tenant is reproducible on
+    its own and independent of the tenant count.
+    """
+    config = story.tenants
+    if config is None:
+        return [Tenant(story.org_id, seed, {}, 1.0)]
+
+    tenants = []
+    for index in range(config.count):
+        tenant_seed = derive_seed(seed, "tenant", index)
+        resolver = RuleResolver(rng=substream(tenant_seed, "params"), pool=pool)
+        params = resolver.resolve_data(config.params)
+        activity = float(resolver.resolve_data({"activity": config.activity})["activity"])
+        if activity < 0:
+            raise ValueError(f"Tenant activity must not be negative, got {activity}")
+        tenants.append(Tenant(
+            config.org_id.format(org_id=story.org_id, index=index),
+            tenant_seed,
+            params,
+            activity
+        ))
+    return tenants
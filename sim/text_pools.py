@@ -0,0 +1,162 @@
+import json
+import os
+import random
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from .faker_utils import generate_company_name, generate_email, generate_url, generate_user_name
+from .rng import derive_seed
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+DEFAULT_POOL_SIZE = 1000
+
+# Fill functions per category; any other category is filled with sentences
+_FILLERS: Dict[str, Callable[["Faker"], str]] = {
+    "company": lambda faker: generate_company_name(faker.random, faker),
+    "user_name": lambda faker: generate_user_name(faker.random, faker),
+    "email": lambda faker: generate_email(faker.random, faker),
+    "url": lambda faker: generate_url(faker.random, faker),
+    "name": lambda faker: faker.name(),
+    "word": lambda faker: faker.word(),
+    "sentence": lambda faker: faker.sentence(),
+}
+
+def _fit(value: str, min_length: Optional[int], max_length: Optional[int]) -> str:
+    """Repeat a value up to `min_length` characters and cut it to `max_length`."""
+    if min_length is not None and len(value) < min_length:
+        value = " ".join([value or "x"] * min_length)[:min_length]
+    return value[:max_length] if max_length is not None else value
+
+class TextPool:
+    """
+    Pre-generated pools of text values per category and locale.
+    
+    Each pool is filled once, on first use, by a Faker instance seeded from
+    the pool seed, category, locale and size, so its contents are identical
+    in every process. Values are then sampled with the caller's RNG. The
+    pool size is the number of distinct values a field can take.
+    
+    Args:
+        size: Default number of values per pool
+        locale: Faker locale used to fill pools
+        cache_dir: Optional directory to keep filled pools in between runs
+        seed: Seed for pool contents
+    """
+    
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        locale: str = "en_US",
+        cache_dir: Optional[Union[str, Path]] = None,
+        seed: int = 0
+    ):
+        if size < 1:
+            raise ValueError("Text pool size must be at least 1")
+        self.size = size
+        self.locale = locale
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.seed = seed
+        self._pools: Dict[Tuple[str, int], List[str]] = {}
+        self._fitted: Dict[Tuple[str, int, Optional[int], Optional[int]], List[str]] = {}
+    
+    @property
+    def config(self) -> Tuple[int, str, Optional[str], int]:
+        """Settings that fully determine the pool contents."""
+        return (self.size, self.locale, str(self.cache_dir) if self.cache_dir else None, self.seed)
+    
+    def __reduce__(self):
+        # Ship only the settings to worker processes; they refill or load from disk
+        return (TextPool, self.config)
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TextPool) and self.config == other.config
+    
+    def __hash__(self) -> int:
+        return hash(self.config)
+    
+    def get(
+        self,
+        category: str,
+        cardinality: Optional[int] = None,
+        max_length: Optional[int] = None,
+        min_length: Optional[int] = None
+    ) -> List[str]:
+        """
+        Get the values of a pool, filling it on first use.
+        
+        Values are optionally cut to `max_length`, and values shorter than
+        `min_length` are repeated until they are long enough.
+        """
+        size = cardinality or self.size
+        if max_length is not None or min_length is not None:
+            key = (category, size, min_length, max_length)
+            if key not in self._fitted:
+                self._fitted[key] = [
+                    _fit(value, min_length, max_length) for value in self.get(category, cardinality)
+                ]
+            return self._fitted[key]
+        key = (category, size)
+        values = self._pools.get(key)
+        if values is None:
+            values = self._load(category, size)
+            if values is None:
+                values = self._fill(category, size)
+                self._store(category, size, values)
+            self._pools[key] = values
+        return values
+    
+    def sampler(
+        self,
+        category: str,
+        rng: random.Random,
+        cardinality: Optional[int] = None,
+        max_length: Optional[int] = None,
+        min_length: Optional[int] = None
+    ) -> Callable[[], str]:
+        """Get a zero-argument function drawing values from a pool with `rng`."""
+        return partial(rng.choice, self.get(category, cardinality, max_length, min_length))
+    
+    def _fill(self, category: str, size: int) -> List[str]:
+        """Generate the values of a pool."""
+        from faker import Faker
+        faker = Faker(self.locale)
+        faker.seed_instance(derive_seed(self.seed, category, self.locale, size))
+        fill = _FILLERS.get(category, _FILLERS["sentence"])
+        return [fill(faker) for _ in range(size)]
+    
+    def _cache_path(self, category: str, size: int) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{category}-{self.locale}-{size}-{self.seed}.json"
+    
+    def _load(self, category: str, size: int) -> Optional[List[str]]:
+        """Load a pool from the on-disk cache, if there is one."""
+        path = self._cache_path(category, size)
+        if path is None or not path.exists():
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+    
+    def _store(self, category: str, size: int, values: List[str]) -> None:
+        """Write a pool to the on-disk cache atomically."""
+        path = self._cache_path(category, size)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(values, f)
+        os.replace(tmp_path, path)
+
+_TEXT_POOL: Optional[TextPool] = None
+
+def get_text_pool() -> TextPool:
+    """Get or create the default text pool."""
+    global _TEXT_POOL
+    if _TEXT_POOL is None:
+        _TEXT_POOL = TextPool()
+    return _TEXT_POOL
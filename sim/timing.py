@@ -0,0 +1,310 @@
+import math
+import random
+import re
+from datetime import datetime, timedelta
+from collections.abc import Sequence
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from .config import ArrivalConfig, DelayConfig, Duration, EventSpec
+
+ARRIVAL_PROCESSES = ("uniform", "poisson", "diurnal", "burst")
+
+DELAY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+DAY = timedelta(days=1)
+
+_DURATION_UNITS = {
+    "ms": timedelta(milliseconds=1),
+    "s": timedelta(seconds=1),
+    "m": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "w": timedelta(weeks=1),
+}
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h|d|w)')
+
+def parse_duration(value: Union[str, int, float, timedelta]) -> timedelta:
+    """
+    Parse a duration such as "90s", "15m", "1h30m" or "2d".
+
+    Plain numbers are taken as seconds.
+    """
+    if isinstance(value, timedelta):
+        return value
+    if isinstance(value, (int, float)):
+        return timedelta(seconds=value)
+
+    text = value.replace(" ", "")
+    parts = _DURATION_PART.findall(text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        raise ValueError(f"Invalid duration: {value!r}")
+    return sum((float(number) * _DURATION_UNITS[unit] for number, unit in parts), timedelta())
+
+def spec_times(
+    event_spec: EventSpec,
+    start_date: datetime,
+    rng: random.Random,
+    activity: float = 1.0
+) -> Iterator[datetime]:
+    """
+    Lazily generate the timestamps of a spec's repetitions in sorted order.
+
+    Repetitions start `offset_days` after `start_date` and are spaced by
+    `every` (daily by default). The arrival process decides how:
+
+    - "uniform": exactly `every` apart, each shifted by up to `jitter`
+      (the only process taking `jitter`; `EventSpec` rejects it otherwise)
+    - "poisson": exponential gaps averaging `every`
+    - "diurnal": Poisson arrivals whose rate follows a daily cosine curve
+      peaking at `peak_hour`, averaging one event per `every`
+    - "burst": bursts of `burst_size` events `burst_spacing` apart on
+      average, with Poisson gaps averaging `every` between bursts
+
+    Generation stops after `repeat` events (one when unset, unless a
+    `duration` is given) or once `duration` has elapsed, whichever is first.
+    An `activity` multiplier scales the rate over the same window: spacing
+    is divided by it and `repeat` multiplied by it.
+
+    Uniform arrivals without jitter can be computed without walking them,
+    see `uniform_times`.
+    """
+    if activity <= 0:
+        _schedule(event_spec, start_date, 1.0)
+        return
+    arrival, start, every, jitter, count, end = _schedule(event_spec, start_date, activity)
+
+    if arrival.process == "uniform":
+        times = _uniform(start, every, jitter, rng)
+    elif arrival.process == "poisson":
+        times = _poisson(start, every, rng)
+    elif arrival.process == "diurnal":
+        times = _diurnal(start, every, arrival.peak_hour, arrival.amplitude, rng)
+    else:
+        times = _burst(start, every, arrival.burst_size, parse_duration(arrival.burst_spacing), rng)
+
+    emitted = 0
+    for time in times:
+        if (count is not None and emitted >= count) or (end is not None and time >= end):
+            return
+        yield time
+        emitted += 1
+
+def uniform_times(
+    event_spec: EventSpec,
+    start_date: datetime,
+    activity: float = 1.0,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None
+) -> Optional["UniformTimes"]:
+    """
+    Get the timestamps `spec_times` gives a spec in [window_start, window_end) as a range.
+
+    Only uniform arrivals without jitter have timestamps that can be
+    computed from their index; returns None for every other spec.
+    """
+    if activity <= 0:
+        _schedule(event_spec, start_date, 1.0)
+        return UniformTimes(start_date, DAY, 0, 0)
+    arrival, start, every, jitter, count, end = _schedule(event_spec, start_date, activity)
+    if arrival.process != "uniform" or jitter:
+        return None
+
+    def before(time: datetime) -> int:
+        # Ceiling division: repetitions at exactly `time` are not before it
+        return max(0, -(-(time - start) // every))
+
+    first = before(window_start) if window_start is not None else 0
+    stop = count if count is not None else before(end)
+    if end is not None:
+        stop = min(stop, before(end))
+    if window_end is not None:
+        stop = min(stop, before(window_end))
+    return UniformTimes(start, every, first, max(first, stop))
+
+class UniformTimes(Sequence):
+    """
+    The timestamps `start + index * every` for index in [first, stop).
+
+    A read-only sequence of datetimes that is never materialized unless
+    iterated; indexes are relative to `first`. `to_numpy()` and
+    `isoformats()` produce all of them at once with NumPy.
+    """
+    __slots__ = ("start", "every", "first", "stop")
+
+    def __init__(self, start: datetime, every: timedelta, first: int, stop: int):
+        self.start = start
+        self.every = every
+        self.first = first
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.first
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            first, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("UniformTimes only supports contiguous slices")
+            return UniformTimes(self.start, self.every, self.first + first, self.first + max(first, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("UniformTimes index out of range")
+        return self.start + (self.first + index) * self.every
+
+    def __iter__(self) -> Iterator[datetime]:
+        start, every = self.start, self.every
+        for index in range(self.first, self.stop):
+            yield start + index * every
+
+    def to_numpy(self):
+        """The timestamps as a NumPy datetime64[us] array; they must be naive."""
+        if self.start.tzinfo is not None:
+            raise ValueError("Only naive timestamps can be converted to datetime64")
+        from .columns import numpy
+        np = numpy()
+        every = np.timedelta64(self.every // timedelta(microseconds=1), "us")
+        return np.datetime64(self.start, "us") + np.arange(self.first, self.stop) * every
+
+    def isoformats(self) -> List[str]:
+        """The `isoformat()` of every timestamp, formatted by NumPy where it gives the same text."""
+        start = self.start
+        whole_seconds = not start.microsecond and not self.every.microseconds
+        if start.tzinfo is not None or not whole_seconds:
+            return [time.isoformat() for time in self]
+        from .columns import numpy
+        return numpy().datetime_as_string(self.to_numpy(), unit="s").tolist()
+
+def delay_sampler(delay: Union[Duration, DelayConfig], rng: random.Random) -> Callable[[], timedelta]:
+    """
+    Build a function drawing delays from a follow-up's delay distribution.
+
+    A plain duration is a fixed delay. Otherwise, with `mean` the average:
+
+    - "fixed": always `mean`
+    - "uniform": between `min` and `max`
+    - "exponential": memoryless delays, e.g. time until a reply
+    - "lognormal": right-skewed delays with shape `sigma`, e.g. shipping
+      or processing times
+
+    Draws are clamped to [`min`, `max`] when given.
+    """
+    if not isinstance(delay, DelayConfig):
+        fixed = parse_duration(delay)
+        if fixed < timedelta(0):
+            raise ValueError("delay must not be negative")
+        return lambda: fixed
+    if delay.distribution not in DELAY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown delay distribution: {delay.distribution}")
+
+    mean = parse_duration(delay.mean)
+    low = parse_duration(delay.min) if delay.min is not None else timedelta(0)
+    high = parse_duration(delay.max) if delay.max is not None else None
+    if mean < timedelta(0) or (high is not None and high < low):
+        raise ValueError("delay mean must not be negative and max not below min")
+
+    if delay.distribution == "fixed":
+        draw = lambda: mean
+    elif delay.distribution == "uniform":
+        if high is None:
+            raise ValueError("uniform delays require max")
+        draw = lambda: low + rng.random() * (high - low)
+    elif delay.distribution == "exponential":
+        draw = lambda: rng.expovariate(1.0) * mean
+    else:
+        # mu chosen so the distribution's mean is `mean`
+        mu = -delay.sigma ** 2 / 2
+        draw = lambda: rng.lognormvariate(mu, delay.sigma) * mean
+
+    def sample() -> timedelta:
+        value = max(draw(), low)
+        return min(value, high) if high is not None else value
+
+    return sample
+
+def _schedule(
+    event_spec: EventSpec,
+    start_date: datetime,
+    activity: float
+) -> Tuple[ArrivalConfig, datetime, timedelta, timedelta, Optional[int], Optional[datetime]]:
+    """Check a spec's timing and get its (arrival, start, every, jitter, count, end) at an activity."""
+    arrival = event_spec.arrival
+    if isinstance(arrival, str):
+        arrival = ArrivalConfig(process=arrival)
+    if arrival.process not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Unknown arrival process: {arrival.process}")
+
+    every = parse_duration(event_spec.every) if event_spec.every is not None else DAY
+    if every <= timedelta(0):
+        raise ValueError("every must be a positive duration")
+    jitter = parse_duration(event_spec.jitter) if event_spec.jitter is not None else timedelta(0)
+    if jitter > every:
+        # Larger jitter would let neighbouring repetitions swap places
+        raise ValueError("jitter must not exceed every")
+    every /= activity
+    jitter /= activity
+
+    start = start_date + timedelta(days=event_spec.offset_days)
+    end = start + parse_duration(event_spec.duration) if event_spec.duration is not None else None
+    if event_spec.repeat:
+        count = round(event_spec.repeat * activity)
+    elif end is None:
+        count = 1
+    else:
+        count = None
+    return arrival, start, every, jitter, count, end
+
+def _uniform(
+    start: datetime,
+    every: timedelta,
+    jitter: timedelta,
+    rng: random.Random
+) -> Iterator[datetime]:
+    """Evenly spaced repetitions, each delayed by a uniform share of `jitter`."""
+    index = 0
+    while True:
+        time = start + index * every
+        if jitter:
+            time += rng.random() * jitter
+        yield time
+        index += 1
+
+def _poisson(start: datetime, every: timedelta, rng: random.Random) -> Iterator[datetime]:
+    """Homogeneous Poisson arrivals with a mean gap of `every`."""
+    time = start
+    while True:
+        time += rng.expovariate(1.0) * every
+        yield time
+
+def _diurnal(
+    start: datetime,
+    every: timedelta,
+    peak_hour: float,
+    amplitude: float,
+    rng: random.Random
+) -> Iterator[datetime]:
+    """Poisson arrivals with a daily rate curve, drawn by thinning."""
+    peak_rate = 1.0 + amplitude
+    time = start
+    while True:
+        time += rng.expovariate(peak_rate) * every
+        hour = time.hour + time.minute / 60 + time.second / 3600
+        rate = 1.0 + amplitude * math.cos(2 * math.pi * (hour - peak_hour) / 24)
+        if rng.random() * peak_rate < rate:
+            yield time
+
+def _burst(
+    start: datetime,
+    every: timedelta,
+    burst_size: int,
+    spacing: timedelta,
+    rng: random.Random
+) -> Iterator[datetime]:
+    """Poisson-spaced bursts of closely packed events."""
+    time = start
+    while True:
+        time += rng.expovariate(1.0) * every
+        for index in range(burst_size):
+            if index:
+                time += rng.expovariate(1.0) * spacing
+            yield time
@@ -0,0 +1,68 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from autosourcesim import EventStream, PostHogSource
+from autosourcesim.aio import astream
+
+START = datetime(2025, 1, 1)
+
+
+def make_stream():
+    rng = random.Random(1)
+    stream = EventStream(start_time=START, duration=timedelta(hours=2), seed=7, seekable=True)
+    stream.add_source(PostHogSource(
+        org_id="aio",
+        rules={"usage.metrics": {"frequency": "1m", "data": {"active_users": lambda _: rng.randint(1, 9)}}}
+    ))
+    return stream
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+def test_arun_matches_run():
+    expected = [event.model_dump() for event in make_stream().run()]
+    events = asyncio.run(collect(make_stream().arun(chunk_size=7, maxsize=2)))
+    assert [event.model_dump() for event in events] == expected
+
+
+def test_arun_passes_the_window():
+    window = (START + timedelta(minutes=30), START + timedelta(hours=1))
+    expected = [event.model_dump() for event in make_stream().run(*window)]
+    events = asyncio.run(collect(make_stream().arun(*window)))
+    assert [event.model_dump() for event in events] == expected
+
+
+def test_astream_reraises_producer_errors():
+    def failing():
+        yield from make_stream().run()
+        raise RuntimeError("source failed")
+
+    with pytest.raises(RuntimeError, match="source failed"):
+        asyncio.run(collect(astream(failing(), chunk_size=10)))
+
+
+def test_closing_early_stops_the_producer():
+    produced = []
+
+    def endless():
+        while True:
+            produced.append(None)
+            yield len(produced)
+
+    async def take(count):
+        events = astream(endless(), chunk_size=1, maxsize=1)
+        taken = []
+        async for event in events:
+            taken.append(event)
+            if len(taken) == count:
+                break
+        await events.aclose()
+        return taken
+
+    assert asyncio.run(take(3)) == [1, 2, 3]
+    assert len(produced) < 10
@@ -0,0 +1,48 @@
+import random
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel, Field
+
+from sim.autofill import plan_schema
+from sim.rule_resolver import RuleResolver
+
+
+class Line(BaseModel):
+    sku: str = Field(min_length=3, max_length=8)
+    quantity: int = Field(gt=0, multiple_of=5)
+
+
+class Constrained(BaseModel):
+    ratio: float = Field(gt=0, lt=1)
+    weight: float = Field(gt=2.5, le=2.5000000001)
+    price: float = Field(ge=0, le=100, multiple_of=0.25)
+    count: int = Field(gt=10, lt=100, multiple_of=7)
+    code: str = Field(min_length=12, max_length=16)
+    email: str = Field(min_length=40)
+    name: str = Field(max_length=3)
+    tags: List[str] = Field(min_length=2, max_length=4)
+    scores: List[int] = Field(min_length=3)
+    lines: List[Line] = Field(min_length=2)
+    note: Optional[str] = Field(min_length=5)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_autofilled_data_validates_against_constrained_schema(seed):
+    generate = RuleResolver(rng=random.Random(seed)).compile_plan(plan_schema(Constrained))
+    for _ in range(200):
+        Constrained(**generate())
+
+
+def test_open_float_bounds_exclude_the_bound():
+    plan = plan_schema(Constrained)
+    low, high = dict(plan.fields)["ratio"].args
+    assert 0 < low and high < 1
+
+
+def test_unsatisfiable_multiple_is_rejected():
+    class Impossible(BaseModel):
+        value: int = Field(ge=1, le=4, multiple_of=5)
+
+    with pytest.raises(ValueError, match="Impossible.value"):
+        plan_schema(Impossible)
@@ -0,0 +1,68 @@
+import concurrent.futures
+from concurrent.futures import Future
+
+from sim.engine import SimulationEngine
+
+TENANT_STORY = """
+org_id: acme
+start_date: 2025-01-01
+tenants:
+  count: 50
+  org_id: "tenant-{index:03d}"
+events:
+  - source: engine_test
+    event: page.view
+    offset_days: 0
+    every: 1m
+    repeat: 100
+    data:
+      value: random(1, 100)
+  - source: engine_test
+    event: metrics.reported
+    offset_days: 0
+    every: 1m
+    repeat: 100
+    data:
+      cpu: random(0, 100)
+"""
+
+class CountingExecutor:
+    """Runs shards in-process, tracking how many were submitted and not yet collected."""
+
+    def __init__(self, max_workers):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        CountingExecutor.last = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def submit(self, fn, *args):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        future = Future()
+        future.set_result(fn(*args))
+        executor = self
+
+        class Collected:
+            def result(self):
+                executor.in_flight -= 1
+                return future.result()
+
+        return Collected()
+
+def test_worker_shards_in_flight_are_bounded_across_tenants(tmp_path, monkeypatch):
+    story = tmp_path / "tenants.yaml"
+    story.write_text(TENANT_STORY)
+    expected = list(SimulationEngine(validation="off", seed=7, shard_size=10).stream_story(str(story)))
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", CountingExecutor)
+
+    engine = SimulationEngine(validation="off", seed=7, shard_size=10, workers=2)
+    events = engine.stream_story(str(story))
+    first = next(events)
+    assert CountingExecutor.last.max_in_flight <= 2
+    assert [first, *events] == expected
+    assert CountingExecutor.last.max_in_flight <= 2
@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from sim.faker_utils import (
+    generate_company_name, generate_email, generate_error_message, generate_id, generate_url,
+    generate_user_name, generate_version
+)
+from sim.text_pools import TextPool
+
+HELPERS = [
+    generate_company_name, generate_email, generate_error_message, generate_id, generate_url,
+    generate_user_name, generate_version
+]
+
+@pytest.mark.parametrize("helper", HELPERS)
+def test_helpers_are_seeded_by_their_rng_only(helper):
+    random.seed(0)
+    state = random.getstate()
+    first = [helper(random.Random(7)) for _ in range(3)]
+    assert [helper(random.Random(7)) for _ in range(3)] == first
+    assert random.getstate() == state
+
+@pytest.mark.parametrize("helper", [generate_company_name, generate_email, generate_url, generate_user_name])
+def test_pool_samples_use_the_rng(helper):
+    pool = TextPool(size=20, seed=1)
+    random.seed(0)
+    state = random.getstate()
+    assert helper(random.Random(3), pool=pool) == helper(random.Random(3), pool=pool)
+    assert random.getstate() == state
@@ -0,0 +1,66 @@
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, computed_field
+
+from sim.registry import _build_coercer, _build_validator
+
+class Color(str, Enum):
+    RED = "red"
+    GREEN = "green"
+
+class Plain(BaseModel):
+    name: str
+    count: int
+    ratio: float = 1.0
+
+class EnumValues(BaseModel):
+    model_config = ConfigDict(use_enum_values=True, str_strip_whitespace=True)
+    color: Color
+    label: str
+
+class Computed(BaseModel):
+    width: int
+    height: int
+
+    @computed_field
+    @property
+    def area(self) -> int:
+        return self.width * self.height
+
+class Strict(BaseModel):
+    model_config = ConfigDict(strict=True)
+    count: int
+
+class Typed(BaseModel):
+    at: datetime
+    color: Color
+    id: UUID
+    value: float
+
+@pytest.mark.parametrize("schema, data", [
+    (Plain, {"name": "a", "count": 2}),
+    (EnumValues, {"color": "red", "label": "  hi "}),
+    (Computed, {"width": 2, "height": 3}),
+    (Typed, {"at": "2025-01-01T00:00:00", "color": "red", "id": str(UUID(int=1)), "value": 1}),
+])
+def test_validator_matches_model_dump(schema, data):
+    assert _build_validator(schema)(data) == schema(**data).model_dump()
+
+def test_validator_keeps_strict_mode():
+    with pytest.raises(ValidationError):
+        _build_validator(Strict)({"count": "1"})
+
+@pytest.mark.parametrize("schema, data", [
+    (Plain, {"name": "a", "count": 2}),
+    (EnumValues, {"color": "red", "label": "  hi "}),
+    (Computed, {"width": 2, "height": 3}),
+    (Typed, {"at": "2025-01-01T00:00:00", "color": "red", "id": str(UUID(int=1)), "value": 1}),
+])
+def test_coercer_matches_model_dump(schema, data):
+    coerced = _build_coercer(schema)(data)
+    expected = schema(**data).model_dump()
+    assert coerced == expected
+    assert [type(value) for value in coerced.values()] == [type(value) for value in expected.values()]
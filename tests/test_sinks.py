@@ -0,0 +1,83 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from pydantic import BaseModel
+
+from autosourcesim import EventStream, GitHubSource
+from sim.config import Event
+from sim.engine import stream_story
+from sim.registry import register_schema
+from sim.sinks import write_columnar, write_ndjson
+
+class Level(str, Enum):
+    LOW = "low"
+    HIGH = "high"
+
+class Priority(Enum):
+    NORMAL = 1
+    URGENT = 2
+
+@register_schema("sink_test", "reading.taken")
+class Reading(BaseModel):
+    taken_at: datetime
+    level: Level
+    value: float
+
+STORY = """
+org_id: acme
+start_date: 2025-01-01
+events:
+  - source: sink_test
+    event: reading.taken
+    offset_days: 0
+    every: 1m
+    repeat: 50
+    data:
+      taken_at: datetime()
+      level: choice(low, high)
+      value: random(1, 10)
+"""
+
+def test_first_n_events_write_like_full_validation(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    story = tmp_path / "story.yaml"
+    story.write_text(STORY)
+    tables = {}
+    for validation in ("full", "first-n"):
+        path = tmp_path / f"{validation}.parquet"
+        events = stream_story(str(story), validation=validation, validate_first=5, seed=1)
+        assert write_columnar(events, path) == 50
+        tables[validation] = pq.read_table(path)
+    assert tables["first-n"].schema == tables["full"].schema
+    assert tables["first-n"].to_pylist() == tables["full"].to_pylist()
+
+@pytest.mark.parametrize("value, encoded", [
+    (UUID(int=1), str(UUID(int=1))),
+    (Level.HIGH, "high"),
+    (Priority.URGENT, 2),
+    (Decimal("1.10"), "1.10"),
+])
+def test_ndjson_encodes_uuid_enum_and_decimal(tmp_path, value, encoded):
+    path = tmp_path / "events.ndjson"
+    event = Event("sink_test", "value.set", "acme", "2025-01-01T00:00:00", {"value": value})
+    write_ndjson([event], path)
+    assert json.loads(path.read_text())["data"] == {"value": encoded}
+
+def _github_stream(compact):
+    stream = EventStream(datetime(2025, 1, 1), timedelta(hours=3), seed=1, compact=compact)
+    stream.add_source(GitHubSource(
+        repos=["demo/repo"], actors=["user"], rules={"push": {"probability": 0.5, "template": {"branch": "main"}}}
+    ))
+    return stream
+
+def test_ndjson_writes_compact_events_like_models(tmp_path):
+    for compact in (False, True):
+        write_ndjson(_github_stream(compact).run(), tmp_path / f"{compact}.ndjson")
+    compact_lines = (tmp_path / "True.ndjson").read_text().splitlines()
+    assert compact_lines
+    assert compact_lines == (tmp_path / "False.ndjson").read_text().splitlines()
+    assert "metadata" in json.loads(compact_lines[0])
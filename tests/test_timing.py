@@ -0,0 +1,36 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from sim.config import EventSpec
+from sim.timing import spec_times, uniform_times
+
+START = datetime(2025, 1, 1)
+
+@pytest.mark.parametrize("timing", [
+    dict(repeat=50, every="7m"),
+    dict(every="1h", duration="1d"),
+    dict(repeat=100, every="1h", duration="10h"),
+    dict(repeat=20, every="1.5s"),
+])
+@pytest.mark.parametrize("activity", [1.0, 2.5, 0.3])
+@pytest.mark.parametrize("window", [
+    (None, None),
+    (datetime(2025, 1, 2, 3), None),
+    (datetime(2025, 1, 2, 0, 30), datetime(2025, 1, 2, 2)),
+])
+def test_uniform_times_match_spec_times(timing, activity, window):
+    spec = EventSpec(source="timing_test", event="tick", offset_days=1, data={}, **timing)
+    start, end = window
+    expected = [
+        time for time in spec_times(spec, START, random.Random(1), activity)
+        if (start is None or time >= start) and (end is None or time < end)
+    ]
+    times = uniform_times(spec, START, activity, start, end)
+    assert list(times) == expected
+    assert times.isoformats() == [time.isoformat() for time in expected]
+
+def test_uniform_times_skip_jitter_and_random_arrivals():
+    assert uniform_times(EventSpec(source="t", event="e", offset_days=0, repeat=5, jitter="1s"), START) is None
+    assert uniform_times(EventSpec(source="t", event="e", offset_days=0, repeat=5, arrival="poisson"), START) is None